@@ -0,0 +1,160 @@
+import argparse
+import re
+import time
+
+from exact_cover import GRID_TYPES, get_pieces, solve_grid_type
+from placement_index import get_placement_index
+from solve_stats import control_stats, enable_log, log_record
+
+# Signed axis permutations of the 24 proper cube rotations, same order as
+# draw_tetracubes.get_all_rotations and symRotation/4 in symmetry.lp
+ORIENTATIONS = [
+    (1, 2, 3), (1, 3, -2), (1, -2, -3), (1, -3, 2),
+    (-1, 2, -3), (-1, -3, -2), (-1, -2, 3), (-1, 3, 2),
+    (2, 1, -3), (2, -3, -1), (2, -1, 3), (2, 3, 1),
+    (-2, 1, 3), (-2, 3, -1), (-2, -1, -3), (-2, -3, 1),
+    (3, 1, 2), (3, 2, -1), (3, -1, -2), (3, -2, 1),
+    (-3, 1, -2), (-3, -2, -1), (-3, -1, 2), (-3, 2, 1)
+]
+
+POSITION_PATTERN = re.compile(r'fullPosition\((?:"([^"]+)"|(\d+)),(\d+),(\d+),(\d+),(\d+)(?:,(\d+))?\)')
+ASSIGN_PATTERN = re.compile(r'assignType\((\d+),"([^"]+)"\)')
+
+def box_rotations(width, height, depth):
+    """Return the orientations that map a W x H x D box onto itself."""
+    dims = (width, height, depth)
+    return [o for o in ORIENTATIONS if all(dims[abs(a) - 1] == dims[i] for i, a in enumerate(o))]
+
+def rotate_cell(orientation, dims, cell):
+    """Apply a signed axis permutation to a cell of a box with the given dims."""
+    rotated = []
+    for a in orientation:
+        value = cell[abs(a) - 1]
+        rotated.append(value if a > 0 else dims[abs(a) - 1] - 1 - value)
+    return tuple(rotated)
+
+def box_symmetries(width, height, depth, grids=1):
+    """Return the symmetry group of the box as cell permutations (perm[c] is the image of c).
+
+    With two grids every grid is rotated independently and the grids may be swapped.
+    """
+    index = get_placement_index(width, height, depth)
+    n = index.num_cells
+    dims = (width, height, depth)
+    rotations = [[index.cell_index(*rotate_cell(o, dims, index.cell_coords(c))) for c in range(n)]
+                 for o in box_rotations(width, height, depth)]
+    if grids == 1:
+        return [tuple(p) for p in rotations]
+
+    symmetries = []
+    for first in rotations:
+        for second in rotations:
+            for swap in (0, 1):
+                symmetries.append(tuple([c + swap * n for c in first] + [c + (1 - swap) * n for c in second]))
+    return symmetries
+
+def box_edges(width, height, depth, grids=1):
+    """Return the pairs of adjacent cells of every grid, in the order of symmetry.lp."""
+    index = get_placement_index(width, height, depth)
+    edges = []
+    for grid in range(grids):
+        offset = grid * index.num_cells
+        for c in range(index.num_cells):
+            x, y, z = index.cell_coords(c)
+            for nx, ny, nz in ((x + 1, y, z), (x, y + 1, z), (x, y, z + 1)):
+                if nx < width and ny < height and nz < depth:
+                    edges.append((offset + c, offset + index.cell_index(nx, ny, nz)))
+    return edges
+
+def tiling_from_atoms(atoms, width, height, depth):
+    """Return (type per cell, piece per cell) of the fullPosition atoms of one model."""
+    index = get_placement_index(width, height, depth)
+    assigned = {int(m.group(1)): m.group(2) for m in map(ASSIGN_PATTERN.match, atoms) if m}
+    types, pieces = {}, {}
+    for atom in atoms:
+        match = POSITION_PATTERN.match(atom)
+        if not match:
+            continue
+        name, number, rotation_id, x, y, z, grid = match.groups()
+        piece = name if name else int(number)
+        type_name = name if name else assigned[piece]
+        placement = index.find(type_name, int(rotation_id), int(x), int(y), int(z))
+        offset = (int(grid or 1) - 1) * index.num_cells
+        for cell in placement.cells:
+            types[offset + cell] = type_name
+            pieces[offset + cell] = piece
+    num_cells = len(types)
+    return [types[c] for c in range(num_cells)], [pieces[c] for c in range(num_cells)]
+
+def tiling_vector(types, pieces, edges, perm):
+    """Read a tiling through a symmetry: cell types, then same-piece flags of the edges."""
+    return (tuple(types[c] for c in perm)
+            + tuple(int(pieces[perm[a]] == pieces[perm[b]]) for a, b in edges))
+
+def orbit(types, pieces, edges, symmetries):
+    """Return the set of vectors of all the images of a tiling."""
+    return {tiling_vector(types, pieces, edges, perm) for perm in symmetries}
+
+def enumerate_with_clingo(encoding, grid_type, box_symmetry):
+    """Enumerate every model of an encoding (num_hints=0) and return their atoms."""
+    import clingo
+
+    ctl = clingo.Control(["-c", f"grid_type={grid_type}", "-c", "num_hints=0",
+                          "-c", f"box_symmetry={box_symmetry}", "--models=0"])
+    ctl.load(encoding)
+    start_time = time.perf_counter()
+    ctl.ground([("base", [])])
+    ground_time = time.perf_counter() - start_time
+    models = []
+    start_time = time.perf_counter()
+    ctl.solve(on_model=lambda model: models.append([str(s) for s in model.symbols(shown=True)]))
+    log_record("enumerate", encoding, GRID_TYPES[encoding][grid_type], len(get_pieces(encoding)),
+               control_stats(ctl, ground_time, time.perf_counter() - start_time), grid_type=grid_type,
+               box_symmetry=box_symmetry, models=len(models), result="SAT" if models else "UNSAT")
+    return models
+
+def check_counts(encoding="PUZZLE.lp", grid_type=1):
+    """Check that box_symmetry=1 keeps exactly one tiling per class of box symmetries.
+
+    Raw tilings are enumerated with the DLX backend, representatives with clingo; the
+    check is raw count = sum of the orbit sizes of the representatives.
+    """
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    symmetries = box_symmetries(width, height, depth, grids)
+    edges = box_edges(width, height, depth, grids)
+
+    start_time = time.perf_counter()
+    raw = solve_grid_type(encoding, grid_type, 0, None, 0)
+    raw_time = time.perf_counter() - start_time
+    classes = set()
+    for atoms in raw:
+        types, pieces = tiling_from_atoms(atoms, width, height, depth)
+        classes.add(min(orbit(types, pieces, edges, symmetries)))
+
+    start_time = time.perf_counter()
+    representatives = enumerate_with_clingo(encoding, grid_type, 1)
+    broken_time = time.perf_counter() - start_time
+    orbit_sizes = []
+    found = set()
+    for atoms in representatives:
+        types, pieces = tiling_from_atoms(atoms, width, height, depth)
+        images = orbit(types, pieces, edges, symmetries)
+        orbit_sizes.append(len(images))
+        found.add(min(images))
+
+    ok = len(representatives) == len(found) == len(classes) and sum(orbit_sizes) == len(raw)
+    print(f"{encoding} grid_type={grid_type}: {len(symmetries)} symmetries, "
+          f"raw {len(raw)} ({raw_time:.2f}s dlx), representatives {len(representatives)} "
+          f"({broken_time:.2f}s clingo), classes {len(classes)}, "
+          f"sum of orbit sizes {sum(orbit_sizes)} -> {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check box-symmetry breaking against the DLX enumeration.")
+    parser.add_argument("--grid-types", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--stats-log", default=None, help="append a JSON record of every clingo solve to this file")
+    args = parser.parse_args()
+    if args.stats_log:
+        enable_log(args.stats_log)
+    for grid_type in args.grid_types:
+        check_counts("PUZZLE.lp", grid_type)
@@ -0,0 +1,5 @@
+# Box layouts (width, height, depth, number of grids) for each encoding and grid_type
+GRID_TYPES = {
+    "PUZZLE.lp": {1: (4, 4, 2, 1), 2: (8, 2, 2, 1), 3: (4, 2, 2, 2)},
+    "PUZZLE_COMPLEX.lp": {1: (4, 4, 4, 1), 2: (8, 4, 2, 1), 3: (4, 2, 4, 2)}
+}
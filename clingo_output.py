@@ -0,0 +1,201 @@
+import argparse
+import json
+import re
+import resource
+import sys
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+from itertools import chain
+
+import numpy as np
+
+from box_symmetry import ASSIGN_PATTERN, POSITION_PATTERN
+from piece_library import ROTATIONS
+
+# One placed piece; piece is the type name (PUZZLE.lp) or the numeric ID (PUZZLE_COMPLEX.lp)
+Piece = namedtuple("Piece", ["piece", "type_name", "rotation_id", "x", "y", "z", "grid", "hint"])
+
+# Piece records of a Model, 9 bytes each; piece 0 means the piece is named by its type
+PIECE_DTYPE = np.dtype([("piece", "<i2"), ("type", "u1"), ("rotation", "u1"),
+                        ("x", "u1"), ("y", "u1"), ("z", "u1"), ("grid", "u1"), ("hint", "?")])
+
+# Type IDs of the piece records, shared by every model of the process
+TYPE_NAMES = list(ROTATIONS)
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+
+def type_id(name):
+    if name not in TYPE_IDS:
+        TYPE_IDS[name] = len(TYPE_NAMES)
+        TYPE_NAMES.append(name)
+    return TYPE_IDS[name]
+
+class Model:
+    """One answer, parsed once: a record array of its pieces (see PIECE_DTYPE), the
+    answer number and the (width, height, depth, grids) box when the answer shows it.
+
+    puzzle and solution are views over the same records (hint pieces only, all
+    pieces); iterating a model or a view yields Piece tuples.
+    """
+
+    __slots__ = ("number", "pieces", "box")
+
+    def __init__(self, number, pieces, box=None):
+        self.number = number
+        self.pieces = pieces
+        self.box = box
+
+    @property
+    def puzzle(self):
+        return ModelView(self, True)
+
+    @property
+    def solution(self):
+        return ModelView(self, False)
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __iter__(self):
+        return iter(self.solution)
+
+    def extent(self):
+        """Return the box as shown, or else the (width, height, depth, grids) that the
+        cells of a full tiling span."""
+        if self.box is not None:
+            return self.box
+        size = [0, 0, 0]
+        grids = 1
+        for piece in self:
+            for dx, dy, dz in ROTATIONS[piece.type_name][piece.rotation_id - 1]:
+                size = [max(size[0], piece.x + dx + 1), max(size[1], piece.y + dy + 1), max(size[2], piece.z + dz + 1)]
+            grids = max(grids, piece.grid)
+        return tuple(size) + (grids,)
+
+class ModelView:
+    """The pieces of a model, or only its hint pieces, without copying the records."""
+
+    __slots__ = ("model", "hints_only")
+
+    def __init__(self, model, hints_only):
+        self.model = model
+        self.hints_only = hints_only
+
+    def __iter__(self):
+        for piece, type_index, rotation, x, y, z, grid, hint in self.model.pieces.tolist():
+            if hint or not self.hints_only:
+                type_name = TYPE_NAMES[type_index]
+                yield Piece(piece or type_name, type_name, rotation, x, y, z, grid, hint)
+
+    def __len__(self):
+        return int(self.model.pieces["hint"].sum()) if self.hints_only else len(self.model.pieces)
+
+    def placements(self):
+        """(type, rotation, x, y, z, grid) of the pieces, as used by uniqueness and min_hints."""
+        return [(p.type_name, p.rotation_id, p.x, p.y, p.z, p.grid) for p in self]
+
+ANSWER_PATTERN = re.compile(r"Answer: (\d+)")
+HINT_ATOM_PATTERN = re.compile(r'(?<![\w])hint\((?:"([^"]+)"|(\d+))\)')
+BOX_PATTERN = re.compile(r"(?<![\w])box\((\d+),(\d+),(\d+)\)")
+GRIDS_PATTERN = re.compile(r"(?<![\w])grids\((\d+)\)")
+
+def parse_model(number, atoms):
+    """Build a Model from the shown atoms of one answer, as one space-separated string.
+
+    Numeric piece IDs are resolved to types with the assignType atoms, wherever
+    they appear in the answer.
+    """
+    types = {int(m.group(1)): m.group(2) for m in ASSIGN_PATTERN.finditer(atoms)}
+    hints = {name if name else int(number_id) for name, number_id in HINT_ATOM_PATTERN.findall(atoms)}
+    records = []
+    for match in POSITION_PATTERN.finditer(atoms):
+        name, number_id, rotation_id, x, y, z, grid = match.groups()
+        piece = name if name else int(number_id)
+        records.append((0 if name else piece, type_id(name if name else types[piece]), int(rotation_id),
+                        int(x), int(y), int(z), int(grid or 1), piece in hints))
+    box = BOX_PATTERN.search(atoms)
+    if box:
+        grids = GRIDS_PATTERN.search(atoms)
+        box = tuple(map(int, box.groups())) + (int(grids.group(1)) if grids else 1,)
+    return Model(number, np.array(records, dtype=PIECE_DTYPE), box)
+
+def _text_answers(lines):
+    """Yield (number, atoms) of a clingo text output: the line after every 'Answer: N'
+    (clingo 5.8 appends '(Time: ...)' to that header)."""
+    number = None
+    for line in lines:
+        if number is not None:
+            yield number, line.strip()
+            number = None
+            continue
+        match = ANSWER_PATTERN.match(line)
+        if match:
+            number = int(match.group(1))
+
+def _json_answers(lines):
+    """Yield (number, atoms) of a clingo --outf=2 output, one witness at a time.
+
+    clingo pretty-prints the JSON with the atoms of a witness between a '"Value": ['
+    line and a closing ']' line, so only one witness is held in memory.
+    """
+    number = 0
+    value = None
+    for line in lines:
+        stripped = line.strip()
+        if value is None:
+            if not stripped.startswith('"Value": ['):
+                continue
+            rest = stripped[len('"Value": ['):]
+            if rest.rstrip(",").endswith("]"):
+                number += 1
+                yield number, " ".join(json.loads("[" + rest.rstrip(",")))
+            else:
+                value = [rest]
+        elif stripped.rstrip(",") == "]":
+            number += 1
+            yield number, " ".join(json.loads("[" + "".join(value) + "]"))
+            value = None
+        else:
+            value.append(stripped)
+
+def read_answers(source):
+    """Yield (number, atoms string) of every answer of a clingo output.
+
+    source is a file name, '-' for stdin, or an iterable of lines (an open file or a
+    pipe). Text and --outf=2 JSON are told apart by the first non-empty character.
+    """
+    if isinstance(source, str):
+        context = nullcontext(sys.stdin) if source == "-" else open(source)
+    else:
+        context = nullcontext(source)
+    with context as lines:
+        lines = iter(lines)
+        for line in lines:
+            if line.strip():
+                break
+        else:
+            return
+        answers = _json_answers if line.lstrip().startswith("{") else _text_answers
+        yield from answers(chain([line], lines))
+
+def read_models(source):
+    """Yield a Model for every answer of a clingo output, streaming (see read_answers)."""
+    for number, atoms in read_answers(source):
+        yield parse_model(number, atoms)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream the models of a clingo output (text or --outf=2).")
+    parser.add_argument("source", nargs="?", default="-", help="output file, default: stdin")
+    parser.add_argument("--print", action="store_true", help="print every model as a JSON line")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    count = 0
+    for model in read_models(args.source):
+        count += 1
+        if args.print:
+            print(json.dumps({"number": model.number, "box": model.box, "pieces": [p._asdict() for p in model]}))
+    elapsed = time.perf_counter() - start_time
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{count} models in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} models/s), "
+          f"peak memory {peak:.0f} MiB", file=sys.stderr)
@@ -0,0 +1,193 @@
+import argparse
+import sys
+import time
+from collections import Counter
+from fractions import Fraction
+
+import numpy as np
+
+from box_symmetry import box_symmetries
+from exact_cover import GRID_TYPES, get_pieces
+from placement_index import TETRACUBES, get_placement_index
+
+def box_rows(width, height, depth, grids):
+    """Return (type index, mask) of every placement of every type in every grid."""
+    index = get_placement_index(width, height, depth)
+    types = list(TETRACUBES)
+    rows = []
+    for grid in range(grids):
+        offset = grid * index.num_cells
+        rows.extend((types.index(p.type_name), p.mask << offset) for p in index.placements)
+    return rows
+
+def permute_mask(mask, perm):
+    image = 0
+    while mask:
+        low = mask & -mask
+        image |= 1 << perm[low.bit_length() - 1]
+        mask ^= low
+    return image
+
+def invariant_rows(rows, perm):
+    """Rows of the tilings fixed by a symmetry: (type index, pieces used, mask).
+
+    A fixed tiling that contains a placement contains its whole orbit under the
+    symmetry, so every orbit whose placements are pairwise disjoint becomes one row
+    that uses one piece per placement; orbits of overlapping placements are dropped.
+    """
+    invariant = {}
+    for type_index, mask in rows:
+        orbit = [mask]
+        while True:
+            image = permute_mask(orbit[-1], perm)
+            if image == mask:
+                break
+            orbit.append(image)
+        union = 0
+        for placement in orbit:
+            if union & placement:
+                break
+            union |= placement
+        else:
+            # Keyed by the orbit: two orbits may cover the same cells differently
+            invariant[type_index, frozenset(orbit)] = (type_index, len(orbit), union)
+    return list(invariant.values())
+
+# Pending states of a cell are merged once this many chunks are waiting
+MERGE_CHUNKS = 64
+# About 20 bytes per state, plus the temporary arrays of a merge
+MAX_STATES = 50_000_000
+
+# Boxes out of reach of this engine, skipped unless their encoding is named. The 4x4x4
+# box with the double piece set has 44M states waiting after 8 of its 64 cells, about
+# four times more per cell: pieces reach three 16-cell layers past the lowest empty
+# cell, and every occupancy comes with up to 3^8 remaining multisets. Merging states
+# under the 48 box symmetries would divide that by 48 at most, two cells' worth
+OUT_OF_REACH = {("PUZZLE_COMPLEX.lp", 1): "4x4x4 with two pieces per type"}
+
+def group_states(occupied, remaining, counts):
+    """Merge equal (occupied, remaining) states of the arrays, adding their counts."""
+    order = np.lexsort((remaining, occupied))
+    occupied, remaining, counts = occupied[order], remaining[order], counts[order]
+    starts = np.flatnonzero(np.concatenate(([True], (occupied[1:] != occupied[:-1])
+                                            | (remaining[1:] != remaining[:-1]))))
+    return occupied[starts], remaining[starts], np.add.reduceat(counts, starts)
+
+def count_exact_covers(rows, num_cells, counts, max_states=MAX_STATES):
+    """Count the tilings of num_cells (at most 64) cells with counts[type] pieces of every type.
+
+    Rows are (type index, pieces used, mask). Partial fillings are states keyed by the
+    occupancy bitmask and the remaining piece multiset, and every state always fills
+    its lowest empty cell, so a row can only be used there if that cell is its lowest
+    one. States are processed bottom-up by lowest empty cell: equal states reached in
+    different orders are merged before they are expanded, and a cell's states are
+    dropped once expanded. The masks are stored shifted down to the lowest empty cell
+    and the multisets as base (max count + 1) digits, in numpy arrays. Pieces of one
+    type are not told apart. Returns (tilings, number of states expanded); raises
+    MemoryError when more than max_states states are waiting to be expanded.
+    """
+    base = max(counts) + 1
+    weights = [base ** i for i in range(len(counts))]
+    by_lowest = [[] for _ in range(num_cells)]
+    for type_index, used, mask in rows:
+        lowest = (mask & -mask).bit_length() - 1
+        by_lowest[lowest].append((type_index, used, mask >> lowest))
+
+    start = sum(count * weight for count, weight in zip(counts, weights))
+    pending = [[] for _ in range(num_cells)]
+    pending[0].append((np.zeros(1, np.uint64), np.array([start], np.int32), np.ones(1, np.int64)))
+    waiting = [0] * num_cells
+    total = 0
+    states = 0
+    for cell in range(num_cells):
+        if not pending[cell]:
+            continue
+        occupied, remaining, ways = group_states(*(np.concatenate(arrays) for arrays in zip(*pending[cell])))
+        pending[cell] = None
+        waiting[cell] = len(occupied)
+        states += len(occupied)
+        full = np.uint64((1 << (num_cells - cell)) - 1)
+        for type_index, used, mask in by_lowest[cell]:
+            mask = np.uint64(mask)
+            fits = ((occupied & mask) == 0) & (remaining // weights[type_index] % base >= used)
+            if not fits.any():
+                continue
+            filled = occupied[fits] | mask
+            left = remaining[fits] - used * weights[type_index]
+            counts_left = ways[fits]
+            done = filled == full
+            total += int(counts_left[done].sum())
+            filled, left, counts_left = filled[~done], left[~done], counts_left[~done]
+            # Number of trailing ones = offset of the next empty cell
+            lowest_empty = ~filled & (filled + np.uint64(1))
+            offsets = np.log2(lowest_empty.astype(np.float64)).astype(np.int64)
+            for offset in np.unique(offsets):
+                same = offsets == offset
+                target = pending[cell + int(offset)]
+                target.append((filled[same] >> np.uint64(offset), left[same], counts_left[same]))
+                waiting[cell + int(offset)] += int(same.sum())
+                if len(target) > MERGE_CHUNKS:
+                    target[:] = [group_states(*(np.concatenate(arrays) for arrays in zip(*target)))]
+                    waiting[cell + int(offset)] = len(target[0][0])
+            if sum(waiting) > max_states:
+                raise MemoryError(f"more than {max_states} states waiting at cell {cell}")
+        waiting[cell] = 0
+    return total, states
+
+def count_tilings(encoding="PUZZLE.lp", grid_type=1, max_states=MAX_STATES):
+    """Return (raw tilings, tilings modulo box symmetries, memoized states) of a box.
+
+    The symmetry classes are counted with Burnside's lemma: the mean over the box
+    symmetries of the number of tilings each of them leaves unchanged.
+    """
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    num_cells = width * height * depth * grids
+    type_counts = Counter(type_name for _, type_name in get_pieces(encoding))
+    counts = [type_counts[name] for name in TETRACUBES]
+    rows = box_rows(width, height, depth, grids)
+
+    raw, states = count_exact_covers([(t, 1, mask) for t, mask in rows], num_cells, counts,
+                                     max_states)
+    fixed = 0
+    symmetries = box_symmetries(width, height, depth, grids)
+    identity = tuple(range(num_cells))
+    for perm in symmetries:
+        if perm == identity:
+            fixed += raw
+        else:
+            fixed += count_exact_covers(invariant_rows(rows, perm), num_cells, counts, max_states)[0]
+    classes = Fraction(fixed, len(symmetries))
+    if classes.denominator != 1:
+        raise ValueError(f"Burnside count is not an integer: {classes}")
+    return raw, int(classes), states
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the tilings of every box, raw and modulo symmetry.")
+    parser.add_argument("encodings", nargs="*", help=f"default: {' '.join(sorted(GRID_TYPES))}")
+    parser.add_argument("--grid-types", type=int, nargs="*", default=[1, 2, 3])
+    parser.add_argument("--max-states", type=int, default=MAX_STATES,
+                        help="give up on a box when more states than this wait to be expanded")
+    args = parser.parse_args()
+    for encoding in args.encodings:
+        if encoding not in GRID_TYPES:
+            parser.error(f"unknown encoding {encoding}")
+
+    print(f"{'encoding':18s} {'grid':>4s} {'box':>10s} {'raw':>14s} {'classes':>12s} {'states':>10s} {'time':>8s}")
+    for encoding in args.encodings or sorted(GRID_TYPES):
+        for grid_type in args.grid_types:
+            width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+            box = f"{grids}x{width}x{height}x{depth}" if grids > 1 else f"{width}x{height}x{depth}"
+            if (encoding, grid_type) in OUT_OF_REACH and not args.encodings:
+                print(f"{encoding:18s} {grid_type:4d} {box:>10s} skipped: {OUT_OF_REACH[encoding, grid_type]} "
+                      f"is out of reach (name the encoding to try anyway)")
+                continue
+            start_time = time.perf_counter()
+            try:
+                raw, classes, states = count_tilings(encoding, grid_type, args.max_states)
+            except MemoryError as error:
+                print(f"{encoding:18s} {grid_type:4d} {box:>10s} gave up: {error} "
+                      f"({time.perf_counter() - start_time:.2f}s)")
+                continue
+            print(f"{encoding:18s} {grid_type:4d} {box:>10s} {raw:14d} {classes:12d} {states:10d} "
+                  f"{time.perf_counter() - start_time:7.2f}s")
+            sys.stdout.flush()
@@ -118,77 +118,44 @@ def normalize_polyomino(polyomino):
     min_z = min(z for x, y, z in polyomino)
     return [(x-min_x, y-min_y, z-min_z) for x, y, z in polyomino]
 
+# The 24 proper rotations of the cube as signed axis permutations: axis i of a
+# rotated point is axis abs(a) - 1 of the original, negated when a < 0
+ORIENTATIONS = [
+    [1, 2, 3], [1, 3, -2], [1, -2, -3], [1, -3, 2],
+    [-1, 2, -3], [-1, -3, -2], [-1, -2, 3], [-1, 3, 2],
+    [2, 1, -3], [2, -3, -1], [2, -1, 3], [2, 3, 1],
+    [-2, 1, 3], [-2, 3, -1], [-2, -1, -3], [-2, -3, 1],
+    [3, 1, 2], [3, 2, -1], [3, -1, -2], [3, -2, 1],
+    [-3, 1, -2], [-3, -2, -1], [-3, -1, 2], [-3, 2, 1]
+]
+
+ORIENTATION_AXES = np.abs(np.array(ORIENTATIONS)) - 1
+ORIENTATION_SIGNS = np.sign(np.array(ORIENTATIONS))
+
+def rotate_all(points):
+    """Apply the 24 rotations to (..., N, 3) integer points in one batch.
+
+    Returns (..., 24, N, 3): every rotated copy translated to the origin (per
+    orientation minimums) and with its points sorted lexicographically.
+    """
+    points = np.asarray(points, dtype=np.int64)
+    # (..., N, 24, 3) -> (..., 24, N, 3)
+    rotated = np.swapaxes(points[..., ORIENTATION_AXES] * ORIENTATION_SIGNS, -2, -3)
+    rotated -= rotated.min(axis=-2, keepdims=True)
+    # Every coordinate is below base, so codes written in that base sort like the tuples
+    base = int(rotated.max(initial=0)) + 1
+    codes = np.sort((rotated[..., 0] * base + rotated[..., 1]) * base + rotated[..., 2], axis=-1)
+    return np.stack((codes // (base * base), codes // base % base, codes % base), axis=-1)
+
 def get_all_rotations(polyomino):
-    """Get all 24 possible 3D rotations of a polyomino."""
+    """Get all distinct 3D rotations of a polyomino (at most 24), in ORIENTATIONS order."""
     rotations = []
-    
-    # Define the 24 rotation matrices for a cube
-    rot_matrices = []
-    
-    # Rotations around x, y, z axes (90, 180, 270 degrees)
-    for axis in range(3):  # 0=x, 1=y, 2=z
-        for angle in range(4):  # 0, 90, 180, 270 degrees
-            matrix = np.identity(3)
-            if angle > 0:
-                # Create rotation matrix
-                if axis == 0:  # x-axis
-                    c, s = np.cos(angle * np.pi/2), np.sin(angle * np.pi/2)
-                    matrix = np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
-                elif axis == 1:  # y-axis
-                    c, s = np.cos(angle * np.pi/2), np.sin(angle * np.pi/2)
-                    matrix = np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
-                elif axis == 2:  # z-axis
-                    c, s = np.cos(angle * np.pi/2), np.sin(angle * np.pi/2)
-                    matrix = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
-            rot_matrices.append(matrix)
-    
-    # Add the remaining orientations to get all 24
-    # These are the 24 ways to orient a cube in 3D space
-    orientations = [
-        [1, 2, 3], [1, 3, -2], [1, -2, -3], [1, -3, 2],
-        [-1, 2, -3], [-1, -3, -2], [-1, -2, 3], [-1, 3, 2],
-        [2, 1, -3], [2, -3, -1], [2, -1, 3], [2, 3, 1],
-        [-2, 1, 3], [-2, 3, -1], [-2, -1, -3], [-2, -3, 1],
-        [3, 1, 2], [3, 2, -1], [3, -1, -2], [3, -2, 1],
-        [-3, 1, -2], [-3, -2, -1], [-3, -1, 2], [-3, 2, 1]
-    ]
-    
-    # Apply each rotation
-    for orientation in orientations:
-        rotated = []
-        for x, y, z in polyomino:
-            # Apply the orientation
-            rx, ry, rz = 0, 0, 0
-            if abs(orientation[0]) == 1:
-                rx = x * orientation[0]
-            elif abs(orientation[0]) == 2:
-                rx = y * (orientation[0] // 2)
-            else:
-                rx = z * (orientation[0] // 3)
-                
-            if abs(orientation[1]) == 1:
-                ry = x * orientation[1]
-            elif abs(orientation[1]) == 2:
-                ry = y * (orientation[1] // 2)
-            else:
-                ry = z * (orientation[1] // 3)
-                
-            if abs(orientation[2]) == 1:
-                rz = x * orientation[2]
-            elif abs(orientation[2]) == 2:
-                rz = y * (orientation[2] // 2)
-            else:
-                rz = z * (orientation[2] // 3)
-                
-            rotated.append((rx, ry, rz))
-        
-        # Normalize the rotated polyomino
-        rotated = normalize_polyomino(rotated)
-        rotated = sorted(rotated)
-        
-        if rotated not in rotations:
-            rotations.append(rotated)
-    
+    seen = set()
+    for rotated in rotate_all(polyomino):
+        key = rotated.tobytes()
+        if key not in seen:
+            seen.add(key)
+            rotations.append([tuple(point) for point in rotated.tolist()])
     return rotations
 
 def get_canonical_form(polyomino):
@@ -0,0 +1,86 @@
+import argparse
+import time
+
+from exact_cover import GRID_TYPES, build_matrix, get_pieces
+from solve_stats import control_stats, enable_log, log_record
+
+def enumerate_clingo(encoding, grid_type, break_duplicates, time_limit):
+    """Enumerate models of an encoding for time_limit seconds.
+
+    Returns (models, distinct tilings, seconds, finished); a tiling is the set of
+    (type, rotation, anchor, grid) placements, whatever IDs the pieces carry.
+    """
+    import clingo
+
+    ctl = clingo.Control(["-c", f"grid_type={grid_type}", "-c", "num_hints=0",
+                          "-c", f"break_duplicates={break_duplicates}", "--models=0"])
+    ctl.load(encoding)
+    types = dict(get_pieces(encoding))
+    tilings = set()
+    models = [0]
+
+    def on_model(model):
+        models[0] += 1
+        placements = []
+        for symbol in model.symbols(atoms=True):
+            if symbol.name == "position":
+                # PUZZLE.lp names its pieces by type (strings), PUZZLE_COMPLEX.lp numbers them
+                args = [a.string if a.type == clingo.SymbolType.String else a.number for a in symbol.arguments]
+                placements.append((types[args[0]],) + tuple(args[1:]))
+        tilings.add(frozenset(placements))
+
+    start_time = time.perf_counter()
+    ctl.ground([("base", [])])
+    ground_time = time.perf_counter() - start_time
+    with ctl.solve(on_model=on_model, async_=True) as handle:
+        finished = handle.wait(max(0.0, time_limit - (time.perf_counter() - start_time)))
+        if not finished:
+            handle.cancel()
+        else:
+            # Raises what the model callback raised, instead of reporting a finished run
+            handle.get()
+    elapsed = time.perf_counter() - start_time
+    log_record("enumerate", encoding, GRID_TYPES[encoding][grid_type], len(types),
+               control_stats(ctl, ground_time, elapsed - ground_time), grid_type=grid_type,
+               break_duplicates=break_duplicates, models=models[0],
+               result=("SAT" if models[0] else "UNSAT") if finished else "UNKNOWN")
+    return models[0], len(tilings), elapsed, finished
+
+def enumerate_dlx(encoding, grid_type, break_duplicates, time_limit):
+    """Same as enumerate_clingo with the DLX backend (the deadline is checked per model)."""
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    start_time = time.perf_counter()
+    matrix, rows = build_matrix(width, height, depth, grids, get_pieces(encoding), None, break_duplicates)
+    deadline = start_time + time_limit
+    tilings = set()
+    models = [0]
+
+    def on_solution(solution):
+        models[0] += 1
+        tilings.add(frozenset((rows[i][1][:5], rows[i][2]) for i in solution))
+        return time.perf_counter() > deadline
+
+    matrix.search(on_solution)
+    elapsed = time.perf_counter() - start_time
+    return models[0], len(tilings), elapsed, elapsed <= time_limit
+
+def measure(encoding="PUZZLE_COMPLEX.lp", grid_types=(1, 2, 3), time_limit=10.0):
+    """Print models and distinct tilings found with and without duplicate breaking."""
+    print(f"{encoding}, num_hints=0, --models=0, {time_limit:g}s per run")
+    print(f"{'backend':8s} {'grid':>4s} {'breaking':>8s} {'models':>9s} {'tilings':>9s} {'tilings/s':>10s} {'time':>8s}")
+    for backend, enumerate_models in (("clingo", enumerate_clingo), ("dlx", enumerate_dlx)):
+        for grid_type in grid_types:
+            for break_duplicates in (1, 0):
+                models, tilings, elapsed, finished = enumerate_models(encoding, grid_type, break_duplicates, time_limit)
+                print(f"{backend:8s} {grid_type:4d} {'on' if break_duplicates else 'off':>8s} {models:9d} "
+                      f"{tilings:9d} {tilings / elapsed:10.1f} {elapsed:7.2f}s{'' if finished else ' (limit)'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure duplicate-piece symmetry breaking.")
+    parser.add_argument("--encoding", default="PUZZLE_COMPLEX.lp", choices=sorted(GRID_TYPES))
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--stats-log", default=None, help="append a JSON record of every clingo solve to this file")
+    args = parser.parse_args()
+    if args.stats_log:
+        enable_log(args.stats_log)
+    measure(args.encoding, time_limit=args.time_limit)
@@ -0,0 +1,290 @@
+import random
+from collections import Counter
+
+from boxes import GRID_TYPES
+from placement_index import TETRACUBES, get_placement_index
+
+def get_pieces(encoding):
+    """Return the (piece, type) pairs placed by an encoding.
+
+    PUZZLE.lp places one piece per type and names it by its type, PUZZLE_COMPLEX.lp
+    places two pieces per type with the IDs of its assignType facts.
+    """
+    types = list(TETRACUBES)
+    if encoding == "PUZZLE_COMPLEX.lp":
+        return [(i + 1, types[i % len(types)]) for i in range(2 * len(types))]
+    return [(name, name) for name in types]
+
+def build_rows(width, height, depth, grids, pieces):
+    """List every in-bounds placement of every piece as (piece, placement, grid)."""
+    index = get_placement_index(width, height, depth)
+    rows = []
+    for piece, type_name in pieces:
+        for grid in range(1, grids + 1):
+            rows.extend((piece, index.placements[i], grid) for i in index.by_type[type_name])
+    return rows
+
+def row_columns(row, num_cells):
+    """Return the cell columns covered by a (piece, placement, grid) row."""
+    offset = (row[2] - 1) * num_cells
+    return [offset + cell for cell in row[1].cells]
+
+class DancingLinks:
+    """Algorithm X on a toroidal doubly linked matrix stored in index arrays.
+
+    Node 0 is the root, nodes 1..num_columns are the column headers and every
+    other node is a 1 of the matrix. Columns listed in multiplicities are secondary:
+    they are never branched on and may be used that many times (the pieces of one
+    type share such a column). Searches always restore the links, so the same matrix
+    can be solved several times.
+    """
+
+    def __init__(self, num_columns, rows, multiplicities=None):
+        n = num_columns
+        self.L = [i - 1 for i in range(n + 1)]
+        self.R = [i + 1 for i in range(n + 1)]
+        self.L[0] = n
+        self.R[n] = 0
+        self.U = list(range(n + 1))
+        self.D = list(range(n + 1))
+        self.C = list(range(n + 1))
+        self.S = [0] * (n + 1)
+        self.row_of = [-1] * (n + 1)
+        self.multiple = [False] * (n + 1)
+        self.remaining = [0] * (n + 1)
+        self.row_start = []
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+
+        for column, count in (multiplicities or {}).items():
+            header = column + 1
+            R[L[header]] = R[header]
+            L[R[header]] = L[header]
+            L[header] = R[header] = header
+            self.multiple[header] = True
+            self.remaining[header] = count
+
+        for row_index, columns in enumerate(rows):
+            first = None
+            for column in columns:
+                header = column + 1
+                node = len(C)
+                C.append(header)
+                self.row_of.append(row_index)
+                U.append(U[header])
+                D.append(header)
+                D[U[header]] = node
+                U[header] = node
+                S[header] += 1
+                if first is None:
+                    first = node
+                    self.row_start.append(node)
+                    L.append(node)
+                    R.append(node)
+                else:
+                    L.append(L[first])
+                    R.append(first)
+                    R[L[first]] = node
+                    L[first] = node
+
+    def cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+
+    def use(self, c):
+        """Account for a selected row in column c, covering c once it is used up."""
+        if self.multiple[c]:
+            self.remaining[c] -= 1
+            if self.remaining[c] == 0:
+                self.cover(c)
+        else:
+            self.cover(c)
+
+    def release(self, c):
+        """Undo use(c)."""
+        if self.multiple[c]:
+            if self.remaining[c] == 0:
+                self.uncover(c)
+            self.remaining[c] += 1
+        else:
+            self.uncover(c)
+
+    def select(self, row_index):
+        """Force a row into every solution (until deselect); its columns must be free."""
+        first = self.row_start[row_index]
+        self.use(self.C[first])
+        j = self.R[first]
+        while j != first:
+            self.use(self.C[j])
+            j = self.R[j]
+
+    def deselect(self, row_index):
+        """Undo select(row_index); rows are deselected in the reverse order."""
+        first = self.row_start[row_index]
+        j = self.L[first]
+        while j != first:
+            self.release(self.C[j])
+            j = self.L[j]
+        self.release(self.C[first])
+
+    def solve(self, limit=1):
+        """Return up to limit solutions, each a list of row indices (limit=0 for all)."""
+        solutions = []
+        self.search(lambda rows: solutions.append(list(rows)) or len(solutions) == limit)
+        return solutions
+
+    def search(self, on_solution):
+        """Call on_solution(rows) for every solution until it returns True."""
+        self._search([], on_solution)
+
+    def _search(self, partial, on_solution):
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        if R[0] == 0:
+            return bool(on_solution(partial))
+
+        # Minimum remaining values: branch on the column with the fewest rows
+        best = c = R[0]
+        size = S[c]
+        while c != 0 and size > 0:
+            if S[c] < size:
+                best, size = c, S[c]
+            c = R[c]
+        if size == 0:
+            return False
+
+        self.cover(best)
+        stop = False
+        r = D[best]
+        while r != best:
+            partial.append(self.row_of[r])
+            j = R[r]
+            while j != r:
+                self.use(C[j])
+                j = R[j]
+            stop = self._search(partial, on_solution)
+            j = L[r]
+            while j != r:
+                self.release(C[j])
+                j = L[j]
+            partial.pop()
+            if stop:
+                break
+            r = D[r]
+        self.uncover(best)
+        return stop
+
+def format_term(value):
+    """Format a piece name or ID the way clingo prints it."""
+    if isinstance(value, str):
+        return f'"{value}"'
+    return str(value)
+
+def solution_atoms(placements, pieces, hints, two_grids):
+    """Build the atoms shown by the encodings for one tiling."""
+    atoms = []
+    numeric = not isinstance(pieces[0][0], str)
+    if numeric:
+        atoms.extend(f'assignType({piece},"{type_name}")' for piece, type_name in pieces)
+    atoms.extend(f"hint({format_term(piece)})" for piece, _ in pieces if piece in hints)
+
+    by_piece = {placement[0]: placement for placement in placements}
+    ordered = [by_piece[piece] for piece, _ in pieces]
+    for prefix, selected in (("fullPosition", ordered),
+                             ("hintPosition", [p for p in ordered if p[0] in hints])):
+        for piece, placement, grid in selected:
+            args = [format_term(piece)] + list(placement[1:5])
+            if two_grids:
+                args.append(grid)
+            atoms.append(f"{prefix}({','.join(str(a) for a in args)})")
+
+    if two_grids:
+        grid_atom = "pieceGrid" if numeric else "typeGrid"
+        atoms.extend(f"{grid_atom}({format_term(p[0])},{p[2]})" for p in ordered)
+    return atoms
+
+def build_matrix(width, height, depth, grids, pieces, seed=None, break_duplicates=True):
+    """Build the exact-cover matrix of a box and return (matrix, rows).
+
+    With break_duplicates, the pieces of one type share their rows and a column that
+    may be used once per piece, so interchangeable copies are never permuted; rows
+    then name the type instead of the piece (see label_pieces). The seed shuffles the
+    rows, so different seeds give different tilings.
+    """
+    if break_duplicates:
+        counts = Counter(type_name for _, type_name in pieces)
+        owners = [(type_name, type_name) for type_name in counts]
+    else:
+        counts = {}
+        owners = pieces
+    rows = build_rows(width, height, depth, grids, owners)
+    if seed is not None:
+        random.Random(seed).shuffle(rows)
+
+    num_cells = width * height * depth
+    owner_column = {owner: num_cells * grids + i for i, (owner, _) in enumerate(owners)}
+    multiplicities = {owner_column[owner]: counts[owner] for owner, _ in owners if counts.get(owner, 1) > 1}
+    matrix = DancingLinks(num_cells * grids + len(owners),
+                          [row_columns(row, num_cells) + [owner_column[row[0]]] for row in rows],
+                          multiplicities)
+    return matrix, rows
+
+def label_pieces(selected, pieces, num_cells):
+    """Turn the selected (owner, placement, grid) rows into one row per piece.
+
+    Rows owned by a type go to the pieces of that type in ID order, the piece with the
+    lower ID taking the placement with the lowest cell index (as in PUZZLE_COMPLEX.lp).
+    """
+    by_owner = {}
+    for row in selected:
+        by_owner.setdefault(row[0], []).append(row)
+    labelled = []
+    for piece, type_name in pieces:
+        if piece in by_owner:
+            labelled.append(by_owner.pop(piece)[0])
+        else:
+            owned = sorted(by_owner[type_name], key=lambda row: min(row_columns(row, num_cells)))
+            labelled.append((piece,) + owned.pop(0)[1:])
+            by_owner[type_name] = owned
+    return labelled
+
+def solve_grid_type(encoding="PUZZLE.lp", grid_type=1, num_hints=6, seed=42, models=1,
+                    break_duplicates=True):
+    """Tile the box of an encoding's grid_type and return the shown atoms of each model.
+
+    The seed shuffles the placement rows, so different seeds give different tilings,
+    and picks which pieces are revealed as hints.
+    """
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    pieces = get_pieces(encoding)
+    matrix, rows = build_matrix(width, height, depth, grids, pieces, seed, break_duplicates)
+
+    rng = random.Random(seed)
+    hint_pieces = set(rng.sample([piece for piece, _ in pieces], min(num_hints, len(pieces))))
+    results = []
+    for solution in matrix.solve(models):
+        placements = label_pieces([rows[i] for i in solution], pieces, width * height * depth)
+        results.append(solution_atoms(placements, pieces, hint_pieces, grids > 1))
+    return results
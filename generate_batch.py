@@ -0,0 +1,169 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from box_symmetry import ASSIGN_PATTERN, POSITION_PATTERN, box_edges, box_symmetries, orbit, tiling_from_atoms
+from exact_cover import GRID_TYPES
+from solve_cache import SolveCache
+from solve_stats import enable_log
+from solve_puzzle import BACKENDS, solve
+
+# State of a worker process, set once by init_worker
+_WORKER = {}
+
+def init_worker(encoding, grid_type, backend, cache_dir=None, stats_log=None):
+    if stats_log:
+        enable_log(stats_log)
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    _WORKER.update(encoding=encoding, grid_type=grid_type, backend=backend, box=(width, height, depth),
+                   symmetries=box_symmetries(width, height, depth, grids),
+                   edges=box_edges(width, height, depth, grids), solver=None,
+                   cache=SolveCache(cache_dir) if cache_dir else None)
+    if backend == "warm":
+        from warm_solver import WarmSolver
+        _WORKER["solver"] = WarmSolver(encoding, grid_type)
+
+def canonical_key(atoms):
+    """Digest of the smallest image of a tiling under the box symmetries.
+
+    Two puzzles get the same key when their solutions only differ by a box rotation
+    (or by the numbering of interchangeable pieces); only the digest is kept, so the
+    memory per puzzle is a few bytes whatever the size of the box.
+    """
+    types, pieces = tiling_from_atoms(atoms, *_WORKER["box"])
+    smallest = min(orbit(types, pieces, _WORKER["edges"], _WORKER["symmetries"]))
+    return hashlib.blake2b(repr(smallest).encode(), digest_size=16).hexdigest()
+
+def puzzle_record(atoms, encoding, grid_type, seed, key):
+    """Describe one puzzle as a JSON-serializable dict."""
+    types = {int(m.group(1)): m.group(2) for m in map(ASSIGN_PATTERN.match, atoms) if m}
+    hints = {atom[len("hint("):-1].strip('"') for atom in atoms if atom.startswith("hint(")}
+    pieces = []
+    for atom in atoms:
+        match = POSITION_PATTERN.match(atom)
+        if not match:
+            continue
+        name, number, rotation_id, x, y, z, grid = match.groups()
+        piece = name if name else int(number)
+        pieces.append({"piece": piece, "type": name if name else types[piece], "rotation": int(rotation_id),
+                       "anchor": [int(x), int(y), int(z)], "grid": int(grid or 1),
+                       "hint": str(piece) in hints})
+    return {"encoding": encoding, "grid_type": grid_type, "seed": seed, "key": key, "pieces": pieces,
+            "hints": [p["piece"] for p in pieces if p["hint"]]}
+
+def generate_one(seed, num_hints):
+    """Worker task: solve with one seed and return (seed, record or None)."""
+    encoding, grid_type, cache = _WORKER["encoding"], _WORKER["grid_type"], _WORKER["cache"]
+    if _WORKER["solver"] is not None:
+        # The warm answer of a seed depends on the requests before it, a cache keeps the first one
+        def solve_warm(*_):
+            atoms = _WORKER["solver"].generate(num_hints, seed)
+            return [atoms] if atoms else []
+        answers = cache.solve(solve_warm, encoding, grid_type, num_hints, seed, 1, "warm") if cache else solve_warm()
+    else:
+        answers = solve(encoding, grid_type, num_hints, seed, 1, _WORKER["backend"], cache)
+    atoms = answers[0] if answers else None
+    if atoms is None:
+        return seed, None
+    return seed, puzzle_record(atoms, encoding, grid_type, seed, canonical_key(atoms))
+
+def read_existing(path):
+    """Return (keys, next seed) of an output file written before, for resuming.
+
+    An unterminated last line is a write cut by an interrupted run (generate_batch
+    truncates it); any other line that is not a record is reported and skipped, so the
+    keys after it are still known.
+    """
+    keys, next_seed = set(), 0
+    if not os.path.exists(path):
+        return keys, next_seed
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.endswith("\n"):
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                keys.add(record["key"])
+                next_seed = max(next_seed, record["seed"] + 1)
+            except (json.JSONDecodeError, KeyError, TypeError) as error:
+                print(f"warning: {path}:{number}: skipping a line that is not a puzzle record ({error})",
+                      file=sys.stderr)
+    return keys, next_seed
+
+def generate_batch(encoding, grid_type, count, output, num_hints=None, workers=None, backend="dlx",
+                   max_duplicates=1000, resume=True, cache_dir=None, stats_log=None):
+    """Generate count distinct puzzles and append them to a JSONL file as they are solved.
+
+    Seeds are handed out in order with at most a few tasks per worker in flight, so
+    memory does not grow with count (except for the 16-byte keys used to dedupe).
+    Stops early after max_duplicates answers in a row that were already known,
+    e.g. when a small box has fewer symmetry classes than requested. With cache_dir
+    the workers share a SolveCache in that directory; with stats_log they append a
+    record of every clingo solve to that file (see solve_stats).
+    Returns the number of puzzles written.
+    """
+    if num_hints is None:
+        num_hints = 6 if encoding == "PUZZLE.lp" else 8
+    workers = workers or os.cpu_count() or 1
+    keys, seed = read_existing(output) if resume else (set(), 0)
+    if resume and os.path.exists(output):
+        # Drop a partial last line so that the appended records stay valid JSONL
+        with open(output, "rb+") as f:
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+
+    written, duplicates = 0, 0
+    with open(output, "a" if resume else "w") as out, \
+            ProcessPoolExecutor(workers, initializer=init_worker,
+                                initargs=(encoding, grid_type, backend, cache_dir, stats_log)) as pool:
+        pending = set()
+        while written < count and duplicates < max_duplicates:
+            while len(pending) < 2 * workers:
+                pending.add(pool.submit(generate_one, seed, num_hints))
+                seed += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _, record = future.result()
+                if written >= count or record is None:
+                    continue
+                if record["key"] in keys:
+                    duplicates += 1
+                    continue
+                keys.add(record["key"])
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                written += 1
+                duplicates = 0
+        for future in pending:
+            future.cancel()
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate many distinct puzzles as JSON lines.")
+    parser.add_argument("encoding", choices=sorted(GRID_TYPES))
+    parser.add_argument("--grid-type", type=int, default=1)
+    parser.add_argument("--count", type=int, default=100, help="number of new distinct puzzles")
+    parser.add_argument("--num-hints", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backend", choices=BACKENDS + ("warm",), default="dlx")
+    parser.add_argument("--max-duplicates", type=int, default=1000,
+                        help="stop after this many already known answers in a row")
+    parser.add_argument("--output", default="puzzles.jsonl")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of appending")
+    parser.add_argument("--cache", default=None, help="directory of a solve cache shared between runs")
+    parser.add_argument("--stats-log", default=None,
+                        help="append a JSON record of every clingo solve (clingo and warm backends) to this file")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    written = generate_batch(args.encoding, args.grid_type, args.count, args.output, args.num_hints,
+                             args.workers, args.backend, args.max_duplicates, not args.no_resume, args.cache,
+                             args.stats_log)
+    print(f"{written} new puzzles written to {args.output} in {time.perf_counter() - start_time:.2f}s",
+          file=sys.stderr)
@@ -1,105 +1,96 @@
-from draw_tetracubes import *
+import argparse
+import json
+import time
 
-def generate_lp_file(filename="tetracubes.lp"):
-    """Generate a .lp file with all tetracubes in the format cube("Type", rotation_id, x, y, z)."""
+from boxes import GRID_TYPES
+from piece_library import ROTATIONS, compute_rotations
+from placement_index import get_placement_index
+
+# Lines joined into one write call
+CHUNK_LINES = 4096
+
+def lp_lines(rotations=None, types=False):
+    """Yield the lines of the piece facts of {type: [rotation cells]}: cube/5 per cube,
+    validOrientation/2 per type and, with types, tetracubeType/1 per type (the shipped
+    encodings declare their types themselves)."""
+    rotations = ROTATIONS if rotations is None else rotations
+    for type_name, type_rotations in rotations.items():
+        yield f"% {type_name} piece\n"
+        for rotation_id, rotation in enumerate(type_rotations, 1):
+            prefix = f'cube("{type_name}", {rotation_id}, '
+            yield f"% Rotation {rotation_id}\n" + "".join(f"{prefix}{x}, {y}, {z}). " for x, y, z in rotation) + "\n"
+        yield "\n"
+
+    yield "% Piece types and their valid orientations\n"
+    for type_name, type_rotations in rotations.items():
+        yield f'validOrientation("{type_name}", 1..{len(type_rotations)}).\n'
+    if types:
+        for type_name in rotations:
+            yield f'tetracubeType("{type_name}").\n'
+
+def generate_lp_file(filename="tetracubes.lp", rotations=None, types=False):
+    """Generate a .lp file with every rotation of every piece in the format
+    cube("Type", rotation_id, x, y, z), followed by the validOrientation ranges of the encodings.
+
+    rotations defaults to the piece library; lines are written CHUNK_LINES at a time.
+    """
     with open(filename, "w") as f:
-        # I tetracube
-        tetracube_I = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 0, 3)]
-        tetracube_I_rotated = get_all_rotations(tetracube_I)
-        f.write("% I tetracube\n")
-        for i, rotation in enumerate(tetracube_I_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("I", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")
-        
-        # T tetracube
-        tetracube_T = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 1, 1)]
-        tetracube_T_rotated = get_all_rotations(tetracube_T)
-        f.write("% T tetracube\n")
-        for i, rotation in enumerate(tetracube_T_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("T", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")
-        
-        # L tetracube
-        tetracube_L = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 1, 0)]
-        tetracube_L_rotated = get_all_rotations(tetracube_L)
-        f.write("% L tetracube\n")
-        for i, rotation in enumerate(tetracube_L_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("L", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")
+        buffer = []
+        for line in lp_lines(rotations, types):
+            buffer.append(line)
+            if len(buffer) >= CHUNK_LINES:
+                f.write("".join(buffer))
+                buffer.clear()
+        f.write("".join(buffer))
 
-        # Pyramid tetracube
-        tetracube_Pyramid = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 0, 0)]
-        tetracube_Pyramid_rotated = get_all_rotations(tetracube_Pyramid)
-        f.write("% Pyramid tetracube\n")
-        for i, rotation in enumerate(tetracube_Pyramid_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("Pyramid", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")
-        
-        # O tetracube
-        tetracube_O = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (0, 1, 1)]
-        tetracube_O_rotated = get_all_rotations(tetracube_O)
-        f.write("% O tetracube\n")
-        for i, rotation in enumerate(tetracube_O_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("O", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")   
-        
-        # N tetracube
-        tetracube_N = [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 2)]
-        tetracube_N_rotated = get_all_rotations(tetracube_N)
-        f.write("% N tetracube\n")
-        for i, rotation in enumerate(tetracube_N_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("N", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")
-        
-        # Z tetracube
-        tetracube_Z = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 1, 0)]
-        tetracube_Z_rotated = get_all_rotations(tetracube_Z)
-        f.write("% Z tetracube\n")
-        for i, rotation in enumerate(tetracube_Z_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("Z", {rotation_id}, {x}, {y}, {z}). ')
-            f.write("\n")
-        f.write("\n")
-        
-        # Z_mirror tetracube
-        tetracube_Z_mirror = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 0, 1)]
-        tetracube_Z_mirror_rotated = get_all_rotations(tetracube_Z_mirror)
-        f.write("% Z_mirror tetracube\n")
-        for i, rotation in enumerate(tetracube_Z_mirror_rotated):
-            rotation_id = i + 1
-            f.write(f"% Rotation {rotation_id}\n")
-            for x, y, z in rotation:
-                f.write(f'cube("Z_mirror", {rotation_id}, {x}, {y}, {z}). ')
+def add_lp_facts(control, rotations=None, types=False, part="base"):
+    """Add the facts of generate_lp_file to a clingo Control instead of a file."""
+    control.add(part, [], "".join(lp_lines(rotations, types)))
+
+def load_pieces(filename):
+    """Return {type: [rotation cells]} of a {name: cells} JSON piece set (polycubes.py --output)."""
+    with open(filename) as f:
+        shapes = {name: [tuple(cell) for cell in cells] for name, cells in json.load(f).items()}
+    return compute_rotations(shapes)
+
+def placement_filename(width, height, depth):
+    return f"placements_{width}x{height}x{depth}.lp"
+
+def generate_placement_file(width, height, depth, filename=None):
+    """Generate placement/5 and covers/8 facts for the placements that fit in a box.
+
+    The file is given next to PUZZLE_PLACEMENTS.lp or PUZZLE_COMPLEX_PLACEMENTS.lp,
+    e.g. clingo PUZZLE_PLACEMENTS.lp placements_4x4x2.lp -c grid_type=1
+    """
+    filename = filename or placement_filename(width, height, depth)
+    index = get_placement_index(width, height, depth)
+    with open(filename, "w") as f:
+        f.write(f"% {width}x{height}x{depth} box, {len(index.placements)} placements\n")
+        f.write(f"box({width}, {height}, {depth}).\n")
+        for placement in index.placements:
+            anchor = '"{}", {}, {}, {}, {}'.format(*placement[:5])
+            f.write(f"placement({anchor}). ")
+            for cell in placement.cells:
+                f.write("covers({}, {}, {}, {}). ".format(anchor, *index.cell_coords(cell)))
             f.write("\n")
-        f.write("\n")
-        
+    return filename
+
+def generate_placement_files():
+    """Generate the placement file of every box used by PUZZLE.lp and PUZZLE_COMPLEX.lp."""
+    boxes = {box[:3] for grid_types in GRID_TYPES.values() for box in grid_types.values()}
+    return [generate_placement_file(*box) for box in sorted(boxes)]
 
 if __name__ == "__main__":
-    generate_lp_file()
-    print("Tetracubes LP file generated successfully!") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the piece and placement LP files.")
+    parser.add_argument("--pieces", help="JSON {name: cells} piece set (default: the eight tetracubes)")
+    parser.add_argument("--output", default="tetracubes.lp")
+    parser.add_argument("--types", action="store_true", help="also write tetracubeType/1 facts")
+    args = parser.parse_args()
+
+    rotations = load_pieces(args.pieces) if args.pieces else None
+    start_time = time.perf_counter()
+    generate_lp_file(args.output, rotations, args.types)
+    print(f"{args.output} generated in {time.perf_counter() - start_time:.3f}s")
+    if not args.pieces:
+        generate_placement_files()
+        print("Placement LP files generated successfully!") 
\ No newline at end of file
@@ -0,0 +1,43 @@
+import time
+
+import clingo
+
+from exact_cover import GRID_TYPES
+from generate_tetracubes_lp import placement_filename
+from solve_stats import control_stats
+
+# Each encoding next to its variant that chooses over pre-filtered placement facts
+ENCODING_PAIRS = [
+    ("PUZZLE.lp", "PUZZLE_PLACEMENTS.lp"),
+    ("PUZZLE_COMPLEX.lp", "PUZZLE_COMPLEX_PLACEMENTS.lp")
+]
+
+def ground_size(encoding, grid_type, num_hints=0, extra_files=()):
+    """Ground and solve an encoding once, return its solve_stats.STAT_FIELDS and total time."""
+    ctl = clingo.Control(["-c", f"grid_type={grid_type}", "-c", f"num_hints={num_hints}"])
+    start_time = time.perf_counter()
+    ctl.load(encoding)
+    for filename in extra_files:
+        ctl.load(filename)
+    ctl.ground([("base", [])])
+    ground_time = time.perf_counter() - start_time
+    ctl.solve()
+    total_time = time.perf_counter() - start_time
+    return dict(control_stats(ctl, ground_time, total_time - ground_time), total_time=total_time)
+
+def report_ground_sizes(grid_types=(1, 2, 3)):
+    """Print before/after ground program sizes for every encoding pair and grid_type."""
+    print(f"{'encoding':30s} {'grid':>4s} {'atoms':>8s} {'rules':>8s} {'ground':>9s} {'total':>9s}")
+    for original, filtered in ENCODING_PAIRS:
+        for grid_type in grid_types:
+            sizes = {}
+            box = GRID_TYPES[original][grid_type][:3]
+            for encoding, extra_files in ((original, ()), (filtered, [placement_filename(*box)])):
+                sizes[encoding] = size = ground_size(encoding, grid_type, extra_files=extra_files)
+                print(f"{encoding:30s} {grid_type:4d} {size['atoms']:8d} {size['rules']:8d} "
+                      f"{size['ground_time'] * 1000:7.1f}ms {size['total_time'] * 1000:7.1f}ms")
+            print(f"{'':30s} {'':4s} {sizes[filtered]['atoms'] / sizes[original]['atoms']:8.0%} "
+                  f"{sizes[filtered]['rules'] / sizes[original]['rules']:8.0%}")
+
+if __name__ == "__main__":
+    report_ground_sizes()
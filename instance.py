@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from exact_cover import GRID_TYPES, get_pieces
+from generate_tetracubes_lp import add_lp_facts
+from piece_library import ROTATIONS, TETRACUBES
+from solve_cache import SolveCache, cache_key
+from solve_stats import control_stats, enable_log, log_record
+
+ENCODING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PUZZLE_INSTANCE.lp")
+
+# Boxes of the scaling benchmark, by volume; pieces are dealt round-robin over the types
+SCALING_BOXES = [(2, 2, 4), (4, 2, 4), (4, 4, 2), (6, 4, 2), (4, 4, 4), (6, 4, 4), (8, 4, 4), (6, 6, 4),
+                 (8, 6, 4), (6, 6, 6), (8, 8, 4), (8, 8, 6), (8, 8, 8)]
+
+def make_instance(width, height, depth, grids=1, pieces=None):
+    """Return an instance: {"box": [W, H, D], "grids": N, "pieces": {type: count}}.
+
+    pieces defaults to one piece of every type.
+    """
+    pieces = dict.fromkeys(TETRACUBES, 1) if pieces is None else dict(pieces)
+    return {"box": [width, height, depth], "grids": grids, "pieces": pieces}
+
+def instance_from_grid_type(encoding, grid_type):
+    """The instance of a grid_type of PUZZLE.lp or PUZZLE_COMPLEX.lp."""
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    return make_instance(width, height, depth, grids, Counter(t for _, t in get_pieces(encoding)))
+
+def round_robin_pieces(num_pieces):
+    """Deal num_pieces pieces over the types in TETRACUBES order."""
+    types = list(TETRACUBES)
+    return dict(Counter(types[i % len(types)] for i in range(num_pieces)))
+
+def load_instance(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+def validate_instance(instance, rotations=ROTATIONS):
+    """Raise ValueError unless the instance is well formed and its pieces fill the boxes exactly."""
+    box = instance.get("box")
+    grids = instance.get("grids", 1)
+    pieces = instance.get("pieces")
+    if not (isinstance(box, list) and len(box) == 3 and all(isinstance(n, int) and n > 0 for n in box)):
+        raise ValueError(f"box must be three positive integers, got {box!r}")
+    if not (isinstance(grids, int) and grids > 0):
+        raise ValueError(f"grids must be a positive integer, got {grids!r}")
+    if not isinstance(pieces, dict) or not pieces:
+        raise ValueError("pieces must be a non-empty {type: count} mapping")
+    for type_name, count in pieces.items():
+        if type_name not in rotations:
+            raise ValueError(f"unknown piece type {type_name!r}")
+        if not (isinstance(count, int) and count >= 0):
+            raise ValueError(f"count of {type_name} must be a non-negative integer, got {count!r}")
+    volume = box[0] * box[1] * box[2] * grids
+    cubes = sum(count * len(rotations[type_name][0]) for type_name, count in pieces.items())
+    if volume != cubes:
+        raise ValueError(f"the boxes have {volume} cells but the pieces have {cubes} cubes")
+
+def instance_facts(instance):
+    """Return the box/3, grids/1 and assignType/2 facts of an instance.
+
+    Copies of a type get consecutive IDs, which PUZZLE_INSTANCE.lp relies on to order them.
+    """
+    facts = ["box({}, {}, {}).".format(*instance["box"]), f"grids({instance.get('grids', 1)})."]
+    piece_id = 0
+    for type_name, count in instance["pieces"].items():
+        for _ in range(count):
+            piece_id += 1
+            facts.append(f'assignType({piece_id}, "{type_name}").')
+    return "\n".join(facts) + "\n"
+
+def solve_instance(instance, num_hints=0, seed=42, models=1, time_limit=None, rotations=None, cache=None):
+    """Check and solve an instance with PUZZLE_INSTANCE.lp through the clingo API.
+
+    rotations ({type: [rotation cells]}, e.g. generate_tetracubes_lp.load_pieces) adds
+    the cube facts of pieces beyond the tetracubes. Returns (answers, stats) with
+    the shown atoms of every model and the solve_stats.STAT_FIELDS of the solve with
+    its result ("SAT", "UNSAT", or "UNKNOWN" when time_limit seconds ran out).
+    With a SolveCache, answers and stats of a finished solve are stored and reused.
+    """
+    validate_instance(instance, dict(ROTATIONS, **(rotations or {})))
+    if cache is None:
+        return _solve_instance(instance, num_hints, seed, models, time_limit, rotations)
+    constants = {"instance": instance_facts(instance), "num_hints": num_hints,
+                 "rotations": json.dumps(rotations, sort_keys=True)}
+    answers, stats = cache.cached(cache_key(ENCODING, constants, seed, models, "instance"),
+                                  lambda: _solve_instance(instance, num_hints, seed, models, time_limit, rotations),
+                                  keep=lambda value: value[1]["result"] != "UNKNOWN")
+    return answers, stats
+
+def _solve_instance(instance, num_hints, seed, models, time_limit, rotations):
+    import clingo
+
+    control = clingo.Control(["-c", f"num_hints={num_hints}", "-c", f"seed={seed}",
+                              f"--seed={seed}", f"--models={models}"])
+    control.load(ENCODING)
+    if rotations:
+        add_lp_facts(control, rotations)
+    control.add("base", [], instance_facts(instance))
+    start_time = time.perf_counter()
+    control.ground([("base", [])])
+    ground_time = time.perf_counter() - start_time
+
+    answers = []
+    start_time = time.perf_counter()
+    with control.solve(on_model=lambda m: answers.append([str(s) for s in m.symbols(shown=True)]),
+                       async_=True) as handle:
+        if not handle.wait(time_limit):
+            handle.cancel()
+            result = "UNKNOWN"
+        else:
+            result = "SAT" if handle.get().satisfiable else "UNSAT"
+    stats = dict(control_stats(control, ground_time, time.perf_counter() - start_time), result=result)
+    log_record("instance", "PUZZLE_INSTANCE.lp", instance["box"] + [instance.get("grids", 1)],
+               sum(instance["pieces"].values()), stats, num_hints=num_hints, seed=seed)
+    return answers, stats
+
+def scaling_benchmark(boxes=SCALING_BOXES, time_limit=60, seed=42):
+    """Solve growing boxes (round-robin piece multisets) and yield one row per box."""
+    for width, height, depth in boxes:
+        instance = make_instance(width, height, depth, 1, round_robin_pieces(width * height * depth // 4))
+        _, stats = solve_instance(instance, seed=seed, time_limit=time_limit)
+        yield dict(stats, box=f"{width}x{height}x{depth}", pieces=sum(instance["pieces"].values()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a parameterized instance with PUZZLE_INSTANCE.lp.")
+    parser.add_argument("instance", nargs="?", help="JSON instance file")
+    parser.add_argument("--box", type=int, nargs=3, metavar=("W", "H", "D"), help="instead of a file")
+    parser.add_argument("--grids", type=int, default=1)
+    parser.add_argument("--pieces", nargs="*", default=[], help="type=count, default: one of each type")
+    parser.add_argument("--num-hints", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--models", type=int, default=1)
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--scaling", action="store_true", help="run the scaling benchmark over growing boxes")
+    parser.add_argument("--stats-log", default=None, help="append a JSON record of every solve to this file")
+    parser.add_argument("--cache", default=None, help="directory of a solve cache shared between runs")
+    args = parser.parse_args()
+    if args.stats_log:
+        enable_log(args.stats_log)
+
+    if args.scaling:
+        print(f"{'box':>8s} {'pieces':>6s} {'ground':>8s} {'atoms':>9s} {'rules':>9s} {'solve':>8s} "
+              f"{'choices':>9s} {'conflicts':>9s} {'peak':>7s} result")
+        for row in scaling_benchmark(time_limit=args.time_limit or 60, seed=args.seed):
+            print(f"{row['box']:>8s} {row['pieces']:6d} {row['ground_time']:7.2f}s {row['atoms']:9d} "
+                  f"{row['rules']:9d} {row['solve_time']:7.2f}s {row['choices']:9d} {row['conflicts']:9d} "
+                  f"{row['process_peak_memory']:6.0f}M {row['result']}")
+            sys.stdout.flush()
+        sys.exit()
+
+    if args.instance:
+        instance = load_instance(args.instance)
+    elif args.box:
+        pieces = {name: int(count) for name, count in (p.split("=") for p in args.pieces)} or None
+        instance = make_instance(*args.box, args.grids, pieces)
+    else:
+        parser.error("give an instance file or --box")
+    try:
+        cache = SolveCache(args.cache) if args.cache else None
+        answers, stats = solve_instance(instance, args.num_hints, args.seed, args.models, args.time_limit,
+                                        cache=cache)
+    except ValueError as error:
+        parser.error(str(error))
+    for i, atoms in enumerate(answers, 1):
+        print(f"Answer: {i}")
+        print(" ".join(atoms))
+    print({"SAT": "SATISFIABLE", "UNSAT": "UNSATISFIABLE"}.get(stats["result"], "UNKNOWN"))
+    print(f"ground {stats['ground_time']:.2f}s, solve {stats['solve_time']:.2f}s", file=sys.stderr)
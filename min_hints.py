@@ -0,0 +1,114 @@
+import argparse
+import json
+import sys
+import time
+
+from clingo_output import parse_model
+from exact_cover import GRID_TYPES, solve_grid_type
+from uniqueness import find_completions
+
+def placements_from_atoms(atoms):
+    """Return the (type, rotation, x, y, z, grid) placements of the fullPosition atoms."""
+    return parse_model(0, " ".join(atoms)).solution.placements()
+
+def smallest_hitting_set(masks, size):
+    """Return a bitmask with the fewest bits (at least size) that meets every mask.
+
+    Iterative deepening: branch on the pieces of the smallest mask not met yet.
+    """
+    def extend(chosen, budget):
+        missed = [m for m in masks if not m & chosen]
+        if not missed:
+            return chosen
+        if budget == 0:
+            return None
+        smallest = min(missed, key=lambda m: bin(m).count("1"))
+        for i in range(smallest.bit_length()):
+            if smallest >> i & 1:
+                found = extend(chosen | 1 << i, budget - 1)
+                if found is not None:
+                    return found
+        return None
+
+    while True:
+        found = extend(0, size)
+        if found is not None:
+            return found, size
+        size += 1
+
+def shrink_counterexample(encoding, grid_type, solution, alternative):
+    """Return the pieces of the solution placed differently in an alternative tiling,
+    made as few as possible.
+
+    Greedily forces one more piece of the solution on top of the ones the alternative
+    already shares with it; any completion other than the solution that remains is a
+    counterexample that differs on fewer pieces, so it rules out more hint sets.
+    """
+    target = frozenset(solution)
+    differing = [p for p in solution if p not in alternative]
+    for piece in list(differing):
+        if piece not in differing:
+            continue
+        fixed = [p for p in solution if p not in differing or p == piece]
+        smaller = [t for t in find_completions(encoding, grid_type, fixed, 2) if t != target]
+        if smaller:
+            differing = [p for p in solution if p not in smaller[0]]
+    return sum(1 << solution.index(p) for p in differing)
+
+def minimum_hints(encoding, grid_type, solution):
+    """Find a smallest hint set of a solution that still forces a unique completion.
+
+    Counterexample-guided loop: propose the smallest set of pieces that rules out every
+    alternative tiling found so far, search for a completion of those hints other than
+    the solution, and if there is one, require the next proposal to reveal at least one
+    piece placed differently in it. The DLX matrix of the box is built once and reused
+    by every check. Returns (hint placements, stats).
+    """
+    solution = list(solution)
+    target = frozenset(solution)
+    masks = []
+    size = 0
+    stats = {"checks": 0, "counterexamples": 0}
+    while True:
+        mask, size = smallest_hitting_set(masks, size)
+        hints = [p for i, p in enumerate(solution) if mask >> i & 1]
+        stats["checks"] += 1
+        alternatives = [t for t in find_completions(encoding, grid_type, hints, 2) if t != target]
+        if not alternatives:
+            return hints, stats
+        masks.append(shrink_counterexample(encoding, grid_type, solution, alternatives[0]))
+        stats["counterexamples"] += 1
+
+def minimize_file(input_file, output_file):
+    """Rewrite the hints of every puzzle of a generate_batch.py file with a minimum hint set."""
+    with open(input_file) as lines, open(output_file, "w") as out:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            solution = [(p["type"], p["rotation"]) + tuple(p["anchor"]) + (p["grid"],) for p in record["pieces"]]
+            hints, _ = minimum_hints(record["encoding"], record["grid_type"], solution)
+            for p, placement in zip(record["pieces"], solution):
+                p["hint"] = placement in hints
+            record["hints"] = [p["piece"] for p in record["pieces"] if p["hint"]]
+            out.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the smallest hint set that forces a unique solution.")
+    parser.add_argument("encoding", help="PUZZLE.lp / PUZZLE_COMPLEX.lp, or a generate_batch.py JSONL file")
+    parser.add_argument("--grid-type", type=int, default=1)
+    parser.add_argument("--seeds", type=int, nargs="*", default=[42], help="seeds of the DLX solutions to minimize")
+    parser.add_argument("--output", default="minimal.jsonl", help="output file when minimizing a JSONL file")
+    args = parser.parse_args()
+
+    if args.encoding not in GRID_TYPES:
+        start_time = time.perf_counter()
+        minimize_file(args.encoding, args.output)
+        print(f"written to {args.output} in {time.perf_counter() - start_time:.2f}s", file=sys.stderr)
+    else:
+        for seed in args.seeds:
+            start_time = time.perf_counter()
+            atoms = solve_grid_type(args.encoding, args.grid_type, 0, seed)[0]
+            hints, stats = minimum_hints(args.encoding, args.grid_type, placements_from_atoms(atoms))
+            print(f"seed {seed}: {len(hints)} hints {hints}, {stats['checks']} checks, "
+                  f"{stats['counterexamples']} counterexamples, {time.perf_counter() - start_time:.2f}s")
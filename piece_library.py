@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Base shapes, in the same order as the tetracubeType facts of the encodings
+TETRACUBES = {
+    "I": [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 0, 3)],
+    "T": [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 1, 1)],
+    "L": [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 1, 0)],
+    "Pyramid": [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 0, 0)],
+    "O": [(0, 0, 0), (0, 0, 1), (0, 1, 0), (0, 1, 1)],
+    "N": [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 2)],
+    "Z": [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 1, 0)],
+    "Z_mirror": [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 0, 1)]
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# PIECE_ORIENTATIONS_CACHE points the cache elsewhere (startup_times uses it to time the cold path)
+CACHE_FILE = os.environ.get("PIECE_ORIENTATIONS_CACHE") or os.path.join(HERE, "piece_orientations.json")
+# Bump when the format of the cache file changes
+CACHE_VERSION = 1
+
+def shapes_hash(shapes=TETRACUBES):
+    """Hash of the shapes and of the draw_tetracubes.py source that computes their rotations
+    (rotation IDs are positions in the list of get_all_rotations)."""
+    digest = hashlib.sha256()
+    with open(os.path.join(HERE, "draw_tetracubes.py"), "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps({"version": CACHE_VERSION, "shapes": shapes}).encode())
+    return digest.hexdigest()
+
+def compute_rotations(shapes=TETRACUBES):
+    """Compute the rotation tables with draw_tetracubes (slow: imports matplotlib)."""
+    from draw_tetracubes import get_all_rotations
+    return {name: get_all_rotations(shape) for name, shape in shapes.items()}
+
+def load_rotations(cache_file=CACHE_FILE, shapes=TETRACUBES):
+    """Return {type: [rotation cells]}, rotation_id - 1 indexing the list.
+
+    The tables are read from cache_file when its hash matches the shape definitions,
+    otherwise computed and written back (atomically, skipped if the directory is
+    read-only).
+    """
+    expected = shapes_hash(shapes)
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached["hash"] == expected:
+            return {name: [[tuple(cell) for cell in rotation] for rotation in rotations]
+                    for name, rotations in cached["rotations"].items()}
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    rotations = compute_rotations(shapes)
+    try:
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"hash": expected, "rotations": rotations}, f, separators=(",", ":"))
+        # mkstemp creates the file private to its owner, the cache is shared like the sources
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, cache_file)
+    except OSError:
+        pass
+    return rotations
+
+# Rotation tables, rotation_id - 1 indexes the list (same numbering as tetracubes.lp)
+ROTATIONS = load_rotations()
+
+def orientation_counts():
+    """Number of distinct rotations of every type (the validOrientation ranges)."""
+    return {name: len(rotations) for name, rotations in ROTATIONS.items()}
+
+def startup_times(runs=5):
+    """Time `import piece_library` in fresh interpreters without (cold) and with (warm) the cache.
+
+    The interpreters use a cache file in a temporary directory, the shared one is left alone.
+    """
+    command = [sys.executable, "-c", "import piece_library"]
+    times = {}
+    with tempfile.TemporaryDirectory() as directory:
+        cache_file = os.path.join(directory, "piece_orientations.json")
+        env = dict(os.environ, PIECE_ORIENTATIONS_CACHE=cache_file)
+        for label in ("cold", "warm"):
+            samples = []
+            for _ in range(runs):
+                if label == "cold" and os.path.exists(cache_file):
+                    os.remove(cache_file)
+                start_time = time.perf_counter()
+                subprocess.run(command, cwd=HERE, env=env, check=True)
+                samples.append(time.perf_counter() - start_time)
+            times[label] = sorted(samples)[len(samples) // 2]
+    return times
+
+if __name__ == "__main__":
+    for name, count in orientation_counts().items():
+        print(f"{name:9s} {count:3d} orientations")
+    times = startup_times()
+    print(f"import piece_library: cold {times['cold'] * 1000:.0f} ms, warm {times['warm'] * 1000:.0f} ms "
+          f"(median of 5, fresh interpreter)")
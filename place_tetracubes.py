@@ -1,9 +1,10 @@
 import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
 import numpy as np
+from matplotlib.lines import Line2D
 from matplotlib.widgets import Button, RadioButtons
-from draw_tetracubes import get_all_rotations
-import re
+from clingo_output import read_models
+from piece_library import ROTATIONS
 
 def draw_cube(ax, position, color='blue', alpha=0.7):
     """Draw a single cube at the specified position."""
@@ -23,75 +24,66 @@ def draw_cube(ax, position, color='blue', alpha=0.7):
     ax.add_collection3d(cube)
     return cube
 
-# Définitions des tétracubes de base
-tetracube_I = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 0, 3)]
-tetracube_T = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 1, 1)]
-tetracube_L = [(0, 0, 0), (0, 0, 1), (0, 0, 2), (0, 1, 0)]
-tetracube_Pyramid = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 0, 0)]
-tetracube_O = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (0, 1, 1)]
-tetracube_N = [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 2)]
-tetracube_Z = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 1, 0)]
-tetracube_Z_mirror = [(0, 0, 0), (0, 0, 1), (0, 1, 0), (1, 0, 1)]
+# Unit cube faces as (neighbour direction, corner offsets), same corners as draw_cube
+CUBE_FACES = [
+    ((0, 0, -1), [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]),
+    ((0, 0, 1), [(0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)]),
+    ((-1, 0, 0), [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)]),
+    ((1, 0, 0), [(1, 0, 0), (1, 0, 1), (1, 1, 1), (1, 1, 0)]),
+    ((0, -1, 0), [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)]),
+    ((0, 1, 0), [(0, 1, 0), (1, 1, 0), (1, 1, 1), (0, 1, 1)])
+]
 
-# Générer toutes les rotations pour chaque tétracube
-tetracube_I_rotated = get_all_rotations(tetracube_I)
-tetracube_T_rotated = get_all_rotations(tetracube_T)
-tetracube_L_rotated = get_all_rotations(tetracube_L)
-tetracube_Pyramid_rotated = get_all_rotations(tetracube_Pyramid)
-tetracube_O_rotated = get_all_rotations(tetracube_O)
-tetracube_N_rotated = get_all_rotations(tetracube_N)
-tetracube_Z_rotated = get_all_rotations(tetracube_Z)
-tetracube_Z_mirror_rotated = get_all_rotations(tetracube_Z_mirror)
+def exposed_faces(cells):
+    """Return the faces of a set of unit cubes that are not shared by two of them."""
+    cells = set(cells)
+    faces = []
+    for x, y, z in cells:
+        for (dx, dy, dz), corners in CUBE_FACES:
+            if (x + dx, y + dy, z + dz) not in cells:
+                faces.append([(x + cx, y + cy, z + cz) for cx, cy, cz in corners])
+    return faces
 
-# Dictionnaire de toutes les rotations
-all_rotations = {
-    "I": tetracube_I_rotated,
-    "T": tetracube_T_rotated,
-    "L": tetracube_L_rotated,
-    "Pyramid": tetracube_Pyramid_rotated,
-    "O": tetracube_O_rotated,
-    "N": tetracube_N_rotated,
-    "Z": tetracube_Z_rotated,
-    "Z_mirror": tetracube_Z_mirror_rotated
+def draw_piece(ax, cells, color='blue', alpha=0.7):
+    """Draw a piece as one collection of its exposed faces."""
+    piece = Poly3DCollection(exposed_faces(cells), alpha=alpha)
+    piece.set_facecolor(color)
+    piece.set_edgecolor('black')
+    ax.add_collection3d(piece)
+    return piece
+
+def grid_segments(width, height, depth):
+    """Return the lines of a width x height x depth grid as segments for one Line3DCollection."""
+    segments = [[(i, j, 0), (i, j, depth)] for i in range(width + 1) for j in range(height + 1)]
+    segments += [[(i, 0, k), (i, height, k)] for i in range(width + 1) for k in range(depth + 1)]
+    segments += [[(0, j, k), (width, j, k)] for j in range(height + 1) for k in range(depth + 1)]
+    return segments
+
+# Colors of the tetracube types
+TYPE_COLORS = {
+    "I": "red",
+    "T": "blue",
+    "L": "green",
+    "Pyramid": "purple",
+    "O": "orange",
+    "N": "yellow",
+    "Z": "cyan",
+    "Z_mirror": "magenta"
 }
 
 class SolutionVisualizer:
-    def __init__(self, puzzle_solution, full_solution, cube_type="2x4x4"):
-        self.puzzle_solution = puzzle_solution
-        self.full_solution = full_solution
-        self.current_solution = puzzle_solution  # Start with puzzle view
-        self.cube_type = cube_type
-        self.two_grids = False  # Initialize two_grids to False by default
-        
-        # Set dimensions based on cube type
-        if cube_type == "2x2x8":
-            self.width = 8
-            self.height = 2
-            self.depth = 2
-        elif cube_type == "2x2x4x2":  # Two 2x2x4 grids
-            self.width = 4
-            self.height = 2
-            self.depth = 2
-            self.two_grids = True
-        else:  # Default to 2x4x4
-            self.width = 4
-            self.height = 4
-            self.depth = 2
-        
-        # Parse both solutions
-        self.parse_solution()
-        
+    def __init__(self, model, cube_type=None, box=None):
+        # The model is parsed once; the puzzle and solution are views over its pieces
+        self.model = model
+        self.view = model.puzzle  # Start with puzzle view
+
+        # Box from the model (shown or spanned by the solution) unless given
+        self.width, self.height, self.depth, grids = box or model.extent()
+        self.two_grids = grids == 2
+        self.cube_type = cube_type or f"{self.width}x{self.height}x{self.depth}" + ("x2" if self.two_grids else "")
+
         # Define colors for each tetracube type
-        self.colors = {
-            "I": "red",
-            "T": "blue",
-            "L": "green",
-            "Pyramid": "purple",
-            "O": "orange",
-            "N": "yellow",
-            "Z": "cyan",
-            "Z_mirror": "magenta"
-        }
+        self.colors = TYPE_COLORS
         
         # Setup the figure
         if self.two_grids:
@@ -106,9 +98,9 @@ class SolutionVisualizer:
         
         # Current number of tetracubes to display (0 to start)
         self.num_tetracubes = 0
-        self.max_tetracubes = len(self.tetracube_types)
+        self.max_tetracubes = len(self.view)
         
-        # Store tetracube collections
+        # Store tetracube collections: piece -> collection
         self.tetracube_collections = {}
         
         # Create buttons for navigation
@@ -125,86 +117,16 @@ class SolutionVisualizer:
         self.radio.on_clicked(self.toggle_view)
         
         # Initialize the plot
+        self.setup_axes()
+        plt.tight_layout()
         self.update_plot()
     
-    def parse_solution(self):
-        """Parse both puzzle and full solution."""
-        # Initialize data structures
-        self.tetracube_types = []
-        self.positions = {}
-        self.type_grid = {}
-        self.hint_types = []
-        
-        # Parse the current solution
-        solution = self.current_solution
-        
-        # Extract tetracube types and their positions
-        for item in solution.split():
-            # Extract hint types
-            if item.startswith("hint("):
-                match = re.match(r'hint\("([^"]+)"\)', item)
-                if match:
-                    type_name = match.group(1)
-                    self.hint_types.append(type_name)
-                    
-                    # Ensure the type is in tetracube_types
-                    if type_name not in self.tetracube_types:
-                        self.tetracube_types.append(type_name)
-            
-            # Extract positions for grid_type 1 and 2
-            elif item.startswith("position"):
-                # Format: position("Type",R,X,Y,Z)
-                match = re.match(r'position\("([^"]+)",(\d+),(\d+),(\d+),(\d+)\)', item)
-                if match:
-                    type_name = match.group(1)
-                    rotation = int(match.group(2))
-                    x = int(match.group(3))
-                    y = int(match.group(4))
-                    z = int(match.group(5))
-                    
-                    if type_name not in self.tetracube_types:
-                        self.tetracube_types.append(type_name)
-                        
-                    self.positions[type_name] = (rotation, x, y, z)
-                
-                # Format: position("Type",R,X,Y,Z,G) for grid_type 3
-                match = re.match(r'position\("([^"]+)",(\d+),(\d+),(\d+),(\d+),(\d+)\)', item)
-                if match:
-                    type_name = match.group(1)
-                    rotation = int(match.group(2))
-                    x = int(match.group(3))
-                    y = int(match.group(4))
-                    z = int(match.group(5))
-                    grid = int(match.group(6))
-                    
-                    if type_name not in self.tetracube_types:
-                        self.tetracube_types.append(type_name)
-                        
-                    self.positions[type_name] = (rotation, x, y, z, grid)
-                    self.type_grid[type_name] = grid
-            
-            # Extract grid assignments for grid_type 3
-            elif item.startswith("typeGrid"):
-                match = re.match(r'typeGrid\("([^"]+)",(\d+)\)', item)
-                if match:
-                    type_name = match.group(1)
-                    grid = int(match.group(2))
-                    self.type_grid[type_name] = grid
-    
     def toggle_view(self, label):
-        """Toggle between puzzle and solution view."""
-        if label == 'Puzzle':
-            self.current_solution = self.puzzle_solution
-            # Parse the solution to get hint types
-            self.parse_solution()
-            # Show only hint pieces
-            self.num_tetracubes = len(self.hint_types)
-        else:  # Solution
-            self.current_solution = self.full_solution
-            # Parse the solution to get all tetracube types
-            self.parse_solution()
-            # Show all pieces for the solution
-            self.num_tetracubes = len(self.tetracube_types)
+        """Toggle between puzzle and solution view (no parsing: both views share the model)."""
+        self.view = self.model.puzzle if label == 'Puzzle' else self.model.solution
+        # Show every piece of the view
+        self.max_tetracubes = len(self.view)
+        self.num_tetracubes = self.max_tetracubes
         
         # Update the plot
         self.update_plot()
@@ -221,250 +143,186 @@ class SolutionVisualizer:
             self.num_tetracubes += 1
             self.update_plot()
     
+    def setup_axes(self):
+        """Set labels and limits and draw the grid of every axes, once."""
+        for ax in self.axes:
+            ax.set_xlabel('X')
+            ax.set_ylabel('Y')
+            ax.set_zlabel('Z')
+            ax.set_xlim([0, self.width])
+            ax.set_ylim([0, self.height])
+            ax.set_zlim([0, self.depth])
+            ax.add_collection3d(Line3DCollection(grid_segments(self.width, self.height, self.depth),
+                                                 colors='k', alpha=0.1))
+            ax.title.set_animated(True)
+
+        # Pieces and titles are animated: a click blits them over the cached background. The
+        # legend is part of the background, its layout costs more than the pieces
+        self.background = None
+        # Collection -> (projection matrix, depth) of its last 3D projection
+        self.projections = {}
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        """After a full redraw (first show, resize, mouse rotation), cache the background.
+
+        Canvases that cannot blit (saving as SVG or PDF) keep the last background and
+        only get the animated artists drawn on top, with the renderer of the event.
+        """
+        if getattr(event.canvas, "supports_blit", False):
+            self.background = event.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_animated(event.renderer)
+
+    def draw_animated(self, renderer=None):
+        """Draw the visible pieces, farthest first as Axes3D does, and the titles.
+
+        A piece is projected again only when the view changed since its last projection
+        (a full redraw recomputes the projection matrix of its axes).
+        """
+        renderer = renderer or self.fig.canvas.get_renderer()
+        for ax in self.axes:
+            view = ax.M.tobytes()
+            pieces = [collection for collection in self.tetracube_collections.values()
+                      if collection.axes is ax and collection.get_visible()]
+            for piece in pieces:
+                if self.projections.get(piece, (None,))[0] != view:
+                    self.projections[piece] = (view, piece.do_3d_projection())
+            for piece in sorted(pieces, key=lambda piece: self.projections[piece][1], reverse=True):
+                piece.draw(renderer)
+            ax.title.draw(renderer)
+
+    def refresh(self, full=False):
+        """Blit the animated artists over the background, or redraw everything when there
+        is no background yet or the background itself changed."""
+        if self.background is None or full:
+            self.fig.canvas.draw_idle()
+            return
+        self.fig.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.fig.canvas.blit(self.fig.bbox)
+
     def update_plot(self):
-        # Clear the plot
-        if self.two_grids:
-            for ax in self.axes:
-                ax.clear()
-                
-            # Set labels and limits for both axes
-            for i, ax in enumerate(self.axes):
-                ax.set_xlabel('X')
-                ax.set_ylabel('Y')
-                ax.set_zlabel('Z')
-                ax.set_xlim([0, self.width])
-                ax.set_ylim([0, self.height])
-                ax.set_zlim([0, self.depth])
-                
-                # Draw grid lines
-                for i in range(self.width + 1):
-                    for j in range(self.height + 1):
-                        ax.plot([i, i], [j, j], [0, self.depth], 'k-', alpha=0.1)
-                        
-                for i in range(self.width + 1):
-                    for k in range(self.depth + 1):
-                        ax.plot([i, i], [0, self.height], [k, k], 'k-', alpha=0.1)
-                        
-                for j in range(self.height + 1):
-                    for k in range(self.depth + 1):
-                        ax.plot([0, self.width], [j, j], [k, k], 'k-', alpha=0.1)
-        else:
-            self.ax.clear()
-            
-            # Set labels and limits
-            self.ax.set_xlabel('X')
-            self.ax.set_ylabel('Y')
-            self.ax.set_zlabel('Z')
-            self.ax.set_xlim([0, self.width])
-            self.ax.set_ylim([0, self.height])
-            self.ax.set_zlim([0, self.depth])
-            
-            # Draw grid lines
-            for i in range(self.width + 1):
-                for j in range(self.height + 1):
-                    self.ax.plot([i, i], [j, j], [0, self.depth], 'k-', alpha=0.1)
-                    
-            for i in range(self.width + 1):
-                for k in range(self.depth + 1):
-                    self.ax.plot([i, i], [0, self.height], [k, k], 'k-', alpha=0.1)
-                    
-            for j in range(self.height + 1):
-                for k in range(self.depth + 1):
-                    self.ax.plot([0, self.width], [j, j], [k, k], 'k-', alpha=0.1)
-        
-        # Draw tetracubes
+        pieces = list(self.view)
+        is_solution = not self.view.hints_only
+
+        # Déterminer quels tétracubes afficher
+        pieces_to_draw = pieces[:self.num_tetracubes]
         if self.num_tetracubes == 0:
             title = f"Empty {self.cube_type} Grid"
+        elif self.num_tetracubes == len(self.model) and is_solution:
+            title = f"All Tetracubes in {self.cube_type}"
         else:
-            # Déterminer quels tétracubes afficher
-            if self.current_solution == self.puzzle_solution:
-                # Pour la vue puzzle, utiliser les hints
-                types_to_draw = self.hint_types[:self.num_tetracubes]
-            else:
-                # Pour la vue solution, utiliser tous les types
-                types_to_draw = self.tetracube_types[:self.num_tetracubes]
-            
-            for type_name in types_to_draw:
-                if type_name in self.positions:
-                    self.draw_tetracube(type_name)
-            
-            if self.num_tetracubes == len(self.tetracube_types) and self.current_solution == self.full_solution:
-                title = f"All Tetracubes in {self.cube_type}"
-            else:
-                title = f"{self.num_tetracubes} Tetracubes in {self.cube_type}"
-        
-        # Add a legend
-        from matplotlib.lines import Line2D
-        legend_elements = [Line2D([0], [0], marker='s', color='w', 
-                                 markerfacecolor=self.colors[type_name], markersize=10, label=type_name)
-                          for type_name in self.colors if type_name in self.tetracube_types]
-        
+            title = f"{self.num_tetracubes} Tetracubes in {self.cube_type}"
+
+        # Pieces are drawn once and then only shown or hidden
+        for piece in pieces_to_draw:
+            self.draw_tetracube(piece)
+        shown = {piece.piece for piece in pieces_to_draw}
+        for key, collection in self.tetracube_collections.items():
+            collection.set_visible(key in shown)
+
+        # Update the legend when the listed types change, which needs a full redraw
+        types = {piece.type_name for piece in pieces}
+        legend_types = tuple(type_name for type_name in self.colors if type_name in types)
+        legend_changed = legend_types != getattr(self, 'legend_types', None)
+        if legend_changed:
+            self.legend_types = legend_types
+            legend_elements = [Line2D([0], [0], marker='s', color='w',
+                                      markerfacecolor=self.colors[type_name], markersize=10, label=type_name)
+                               for type_name in legend_types]
+            self.axes[0].legend(handles=legend_elements, loc='upper right')
+
         # Determine if we're showing puzzle or solution
-        view_mode = "Puzzle" if self.current_solution == self.puzzle_solution else "Solution"
-        
+        view_mode = "Solution" if is_solution else "Puzzle"
+
         if self.two_grids:
-            self.axes[0].legend(handles=legend_elements, loc='upper right')
             self.axes[0].set_title(f"Grid 1 - {view_mode} - {self.num_tetracubes}/{self.max_tetracubes}")
             self.axes[1].set_title(f"Grid 2 - {view_mode} - {self.num_tetracubes}/{self.max_tetracubes}")
         else:
-            self.ax.legend(handles=legend_elements, loc='upper right')
             # Add counter
-            plt.title(f"{title} - {view_mode} ({self.num_tetracubes}/{self.max_tetracubes})")
-            
-        plt.tight_layout()
-        self.fig.canvas.draw_idle()
-    
-    def draw_tetracube(self, type_name):
-        color = self.colors[type_name]
-        
-        if self.two_grids:
-            if type_name in self.positions and len(self.positions[type_name]) == 5:
-                rotation_id, x, y, z, grid = self.positions[type_name]
-                ax_index = grid - 1  # Grid 1 -> index 0, Grid 2 -> index 1
-            elif type_name in self.positions and type_name in self.type_grid:
-                rotation_id, x, y, z = self.positions[type_name]
-                grid = self.type_grid[type_name]
-                ax_index = grid - 1
-            else:
-                print(f"Warning: Missing grid information for tetracube {type_name}")
-                return
-                
-            ax = self.axes[ax_index]
-        else:
-            if type_name in self.positions:
-                if len(self.positions[type_name]) == 4:  # (rotation, x, y, z)
-                    rotation_id, x, y, z = self.positions[type_name]
-                else:  # Ignore grid information if not in two_grids mode
-                    rotation_id, x, y, z = self.positions[type_name][:4]
-            else:
-                print(f"Warning: Missing position for tetracube {type_name}")
-                return
-                
-            ax = self.ax
+            self.ax.set_title(f"{title} - {view_mode} ({self.num_tetracubes}/{self.max_tetracubes})")
+
+        self.refresh(legend_changed)
+
+    def draw_tetracube(self, piece):
+        """Draw a Piece of the model once; later calls reuse its collection."""
+        if piece.piece in self.tetracube_collections:
+            return
+        ax = self.axes[piece.grid - 1] if self.two_grids else self.ax
         
         # Get the tetracube shape based on rotation
-        if type_name in all_rotations and 0 <= rotation_id-1 < len(all_rotations[type_name]):
-            shape = all_rotations[type_name][rotation_id-1]
-            
-            # Draw each cube in the tetracube
-            cubes = []
-            for dx, dy, dz in shape:
-                cube = draw_cube(ax, (x + dx, y + dy, z + dz), color)
-                cubes.append(cube)
-            
-            self.tetracube_collections[type_name] = cubes
+        if piece.type_name in ROTATIONS and 0 <= piece.rotation_id - 1 < len(ROTATIONS[piece.type_name]):
+            shape = ROTATIONS[piece.type_name][piece.rotation_id - 1]
+
+            # Draw the tetracube as one collection, without the faces between its cubes
+            cells = [(piece.x + dx, piece.y + dy, piece.z + dz) for dx, dy, dz in shape]
+            collection = draw_piece(ax, cells, self.colors[piece.type_name])
+            collection.set_animated(True)
+            self.tetracube_collections[piece.piece] = collection
         else:
-            print(f"Warning: Tetracube {type_name} with rotation {rotation_id} not found")
+            print(f"Warning: Tetracube {piece.type_name} with rotation {piece.rotation_id} not found")
     
     def show(self):
         plt.show()
 
-def extract_models_from_file(filename):
-    """Extract puzzle and solution models from a file."""
-    with open(filename, 'r') as f:
-        content = f.read()
-    
-    # Find all answer sets
-    match = re.search(r'Answer: \d+\n(.*?)\n', content, re.DOTALL)
-    if not match:
-        return None, None
-    
-    answer = match.group(1).strip()
-    
-    # Create puzzle solution (containing hint pieces)
-    puzzle_parts = []
-    hint_types = []
-    
-    # Extract hint types first
-    for item in answer.split():
-        if item.startswith("hint("):
-            puzzle_parts.append(item)
-            match = re.match(r'hint\("([^"]+)"\)', item)
-            if match:
-                hint_types.append(match.group(1))
-    
-    # Extract positions for hint pieces
-    for item in answer.split():
-        if item.startswith("hintPosition("):
-            # Convert to proper position format
-            fixed_item = item.replace("hintPosition(", "position(")
-            puzzle_parts.append(fixed_item)
-    
-    # Create full solution (containing all pieces)
-    solution_parts = []
-    
-    # Add all hint types
-    for item in puzzle_parts:
-        if item.startswith("hint("):
-            solution_parts.append(item)
-    
-    # Extract positions for all pieces
-    for item in answer.split():
-        if item.startswith("fullPosition("):
-            # Convert to proper position format
-            fixed_item = item.replace("fullPosition(", "position(")
-            solution_parts.append(fixed_item)
-    
-    puzzle_solution = " ".join(puzzle_parts)
-    full_solution = " ".join(solution_parts)
-    
-    return puzzle_solution, full_solution
+def render_benchmark(runs=10):
+    """Median redraw time of a full 4x4x2 and 4x4x4 DLX solution, drawn cube by cube
+    (draw_cube) and piece by piece (draw_piece). Returns {box: {method: (polygons, seconds)}}."""
+    import time
+    from exact_cover import solve_grid_type
+    from min_hints import placements_from_atoms
 
-def detect_grid_type(solution):
-    """Détecte automatiquement le type de grille à partir de la solution."""
-    if "typeGrid" in solution:
-        return "2x2x4x2"  # Deux grilles 2x2x4
-    
-    # Analyser les positions pour déterminer les dimensions
-    max_x = 0
-    max_y = 0
-    
-    for item in solution.split():
-        if item.startswith("position"):
-            # Format: position("Type",R,X,Y,Z)
-            match = re.match(r'position\("([^"]+)",(\d+),(\d+),(\d+),(\d+)\)', item)
-            if match:
-                x = int(match.group(3))
-                y = int(match.group(4))
-                max_x = max(max_x, x)
-                max_y = max(max_y, y)
-    
-    if max_x >= 4:  # Si x va jusqu'à 4 ou plus, c'est probablement 2x2x8
-        return "2x2x8"
-    elif max_y >= 3:  # Si y va jusqu'à 3 ou plus, c'est probablement 2x4x4
-        return "2x4x4"
-    else:
-        # Par défaut, si on ne peut pas déterminer
-        return "2x4x4"
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    results = {}
+    for encoding, box in (("PUZZLE.lp", "4x4x2"), ("PUZZLE_COMPLEX.lp", "4x4x4")):
+        placements = placements_from_atoms(solve_grid_type(encoding, 1, 0, 42)[0])
+        results[box] = {}
+        for method in ("cubes", "pieces"):
+            fig = plt.figure(figsize=(8, 8))
+            ax = fig.add_subplot(111, projection='3d')
+            polygons = 0
+            for i, (type_name, rotation_id, x, y, z, _) in enumerate(placements):
+                cells = [(x + dx, y + dy, z + dz) for dx, dy, dz in ROTATIONS[type_name][rotation_id - 1]]
+                color = colors[i % len(colors)]
+                if method == "cubes":
+                    polygons += 6 * len(cells)
+                    for cell in cells:
+                        draw_cube(ax, cell, color)
+                else:
+                    polygons += len(exposed_faces(cells))
+                    draw_piece(ax, cells, color)
+            samples = []
+            for run in range(runs):
+                ax.view_init(elev=30, azim=run * 7)
+                start_time = time.perf_counter()
+                fig.canvas.draw()
+                samples.append(time.perf_counter() - start_time)
+            plt.close(fig)
+            results[box][method] = (polygons, sorted(samples)[runs // 2])
+    return results
+
+def extract_models_from_file(filename):
+    """Return the first model of a clingo output (text or --outf=2 JSON), or None."""
+    return next(read_models(filename), None)
 
 def visualize_solution_from_file(filename):
     """Visualise une solution à partir d'un fichier."""
-    puzzle_solution, full_solution = extract_models_from_file(filename)
-    
-    if puzzle_solution and full_solution:
-        grid_type = detect_grid_type(full_solution)
-        print(f"Detected grid type: {grid_type}")
-        visualizer = SolutionVisualizer(puzzle_solution, full_solution, grid_type)
-        visualizer.show()
-    elif puzzle_solution:  # If we only have puzzle
-        grid_type = detect_grid_type(puzzle_solution)
-        print(f"Detected grid type: {grid_type}")
-        print("Warning: Only puzzle found, using it as both puzzle and solution")
-        visualizer = SolutionVisualizer(puzzle_solution, puzzle_solution, grid_type)
-        visualizer.show()
-    elif full_solution:  # If we only have solution
-        grid_type = detect_grid_type(full_solution)
-        print(f"Detected grid type: {grid_type}")
-        print("Warning: Only solution found, using it as both puzzle and solution")
-        visualizer = SolutionVisualizer(full_solution, full_solution, grid_type)
-        visualizer.show()
-    else:
+    model = extract_models_from_file(filename)
+    if model is None:
         print("Could not find any valid models in the file.")
+        return
+    print("Box: {}x{}x{} ({} grid(s))".format(*model.extent()))
+    visualizer = SolutionVisualizer(model)
+    visualizer.show()
 
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        for box, methods in render_benchmark().items():
+            for method, (polygons, seconds) in methods.items():
+                print(f"{box} {method:6s} {polygons:4d} polygons, {seconds * 1000:6.1f} ms per redraw")
+    elif len(sys.argv) > 1:
         # Si un fichier est spécifié en argument
         visualize_solution_from_file(sys.argv[1])
     else:
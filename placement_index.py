@@ -0,0 +1,77 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from piece_library import ROTATIONS, TETRACUBES
+
+# One in-bounds placement: anchor (x, y, z) as in position/5, cells as box indices
+Placement = namedtuple("Placement", ["type_name", "rotation_id", "x", "y", "z", "cells", "mask"])
+
+class PlacementIndex:
+    """Every in-bounds placement of every rotation of every tetracube in a W x H x D box.
+
+    Cell (x, y, z) has index (x * height + y) * depth + z and bit 1 << index in the
+    masks, so two placements overlap exactly when their masks share a bit. The index
+    covers a single grid; exact_cover.row_columns offsets the cells of grid g by
+    (g - 1) * num_cells when building the matrix of a multi-grid box.
+    """
+
+    def __init__(self, width, height, depth):
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.num_cells = width * height * depth
+        self.full_mask = (1 << self.num_cells) - 1
+        self.placements = []
+        self.by_type = {name: [] for name in ROTATIONS}
+        self.by_cell = [[] for _ in range(self.num_cells)]
+        self.by_key = {}
+
+        for type_name, rotations in ROTATIONS.items():
+            for rotation_id, shape in enumerate(rotations, 1):
+                size_x = max(dx for dx, dy, dz in shape) + 1
+                size_y = max(dy for dx, dy, dz in shape) + 1
+                size_z = max(dz for dx, dy, dz in shape) + 1
+                for x in range(width - size_x + 1):
+                    for y in range(height - size_y + 1):
+                        for z in range(depth - size_z + 1):
+                            cells = tuple(self.cell_index(x + dx, y + dy, z + dz)
+                                          for dx, dy, dz in shape)
+                            mask = 0
+                            for cell in cells:
+                                mask |= 1 << cell
+                            self.add(Placement(type_name, rotation_id, x, y, z, cells, mask))
+
+    def add(self, placement):
+        index = len(self.placements)
+        self.placements.append(placement)
+        self.by_type[placement.type_name].append(index)
+        for cell in placement.cells:
+            self.by_cell[cell].append(index)
+        self.by_key[placement[:5]] = index
+
+    def cell_index(self, x, y, z):
+        return (x * self.height + y) * self.depth + z
+
+    def cell_coords(self, index):
+        x, rest = divmod(index, self.height * self.depth)
+        y, z = divmod(rest, self.depth)
+        return x, y, z
+
+    def find(self, type_name, rotation_id, x, y, z):
+        """Return the placement of position(Type,R,X,Y,Z), or None if it leaves the box."""
+        index = self.by_key.get((type_name, rotation_id, x, y, z))
+        return None if index is None else self.placements[index]
+
+    def overlaps(self, first, second):
+        return bool(first.mask & second.mask)
+
+@lru_cache(maxsize=None)
+def get_placement_index(width, height, depth):
+    """Return the shared placement index of a box shape, building it on first use."""
+    return PlacementIndex(width, height, depth)
+
+if __name__ == "__main__":
+    for box in [(4, 4, 2), (8, 2, 2), (4, 2, 2), (4, 4, 4), (8, 4, 2), (4, 2, 4)]:
+        index = get_placement_index(*box)
+        counts = ", ".join(f"{name}: {len(ids)}" for name, ids in index.by_type.items())
+        print(f"{box[0]}x{box[1]}x{box[2]}: {len(index.placements)} placements ({counts})")
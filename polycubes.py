@@ -0,0 +1,118 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from draw_tetracubes import rotate_all
+
+# Known counts, index = number of cubes: up to rotation (OEIS A000162) and up to
+# rotation and reflection (OEIS A038119)
+KNOWN_ONE_SIDED = [1, 1, 1, 2, 8, 29, 166, 1023, 6922]
+KNOWN_FREE = [1, 1, 1, 2, 7, 23, 112, 607, 3811]
+
+DIRECTIONS = np.array([(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)])
+MIRROR = np.array([-1, 1, 1])
+
+def canonical_keys(shapes):
+    """Return the canonical key of every (N, 3) shape of an (M, N, 3) array, and the
+    rotation it belongs to.
+
+    A key is the lexicographically smallest sorted list of cell codes over the 24
+    rotations, as big-endian bytes so that bytes order is numeric order.
+    """
+    rotated = rotate_all(shapes)
+    n = shapes.shape[-2]
+    codes = ((rotated[..., 0] * n + rotated[..., 1]) * n + rotated[..., 2]).astype(">u4")
+    keys = []
+    cells = []
+    for shape_codes, shape_rotations in zip(codes, rotated):
+        options = [row.tobytes() for row in shape_codes]
+        best = min(range(len(options)), key=options.__getitem__)
+        keys.append(options[best])
+        cells.append(shape_rotations[best])
+    return keys, cells
+
+def grow(shapes):
+    """Yield (key, cells) of every polycube one cube larger than a shape, once per
+    rotation class.
+
+    Every polycube has a cube whose removal leaves it connected (a leaf of a spanning
+    tree), so growing one representative of every class of size n reaches every class
+    of size n + 1. Candidates of a parent are canonicalized in one NumPy batch and
+    deduplicated with a set of keys.
+    """
+    seen = set()
+    for parent in shapes:
+        parent = np.asarray(parent)
+        occupied = set(map(tuple, parent.tolist()))
+        neighbours = {cell for cell in map(tuple, (parent[:, None, :] + DIRECTIONS).reshape(-1, 3).tolist())
+                      if cell not in occupied}
+        children = np.array([np.vstack((parent, cell)) for cell in sorted(neighbours)])
+        for key, cells in zip(*canonical_keys(children)):
+            if key not in seen:
+                seen.add(key)
+                yield key, cells
+
+def one_sided_polycubes(n):
+    """Yield one representative (an (n, 3) array, normalized and sorted) of every
+    polycube of n cubes up to rotation; mirror images are told apart.
+
+    The smaller sizes are kept in memory only one level at a time.
+    """
+    level = [np.zeros((1, 3), dtype=np.int64)]
+    for _ in range(n - 2):
+        level = [cells for _, cells in grow(level)]
+    if n == 1:
+        yield level[0]
+        return
+    for _, cells in grow(level):
+        yield cells
+
+def free_polycubes(n):
+    """Yield one representative of every polycube of n cubes up to rotation and reflection."""
+    seen = set()
+    for cells in one_sided_polycubes(n):
+        keys, _ = canonical_keys(np.stack((cells, cells * MIRROR)))
+        key = min(keys)
+        if key not in seen:
+            seen.add(key)
+            yield cells
+
+def count_polycubes(n):
+    """Return (one-sided count, free count) of the polycubes of n cubes."""
+    one_sided = 0
+    free = set()
+    for cells in one_sided_polycubes(n):
+        one_sided += 1
+        free.add(min(canonical_keys(np.stack((cells, cells * MIRROR)))[0]))
+    return one_sided, len(free)
+
+def piece_set(n, reflections=False):
+    """Return {name: cells} of the polycubes of n cubes, in the TETRACUBES format."""
+    shapes = free_polycubes(n) if reflections else one_sided_polycubes(n)
+    return {f"P{n}_{i}": [tuple(cell) for cell in cells.tolist()] for i, cells in enumerate(shapes, 1)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enumerate polycubes and check the counts against OEIS.")
+    parser.add_argument("sizes", type=int, nargs="*", default=list(range(1, 9)))
+    parser.add_argument("--output", help="write the pieces of the last size to this JSON file")
+    parser.add_argument("--reflections", action="store_true",
+                        help="with --output: identify mirror images (free polycubes)")
+    args = parser.parse_args()
+
+    print(f"{'n':>2s} {'one-sided':>10s} {'free':>6s} {'time':>8s}")
+    for n in args.sizes:
+        start_time = time.perf_counter()
+        one_sided, free = count_polycubes(n)
+        elapsed = time.perf_counter() - start_time
+        checks = []
+        if n < len(KNOWN_ONE_SIDED):
+            ok = (one_sided, free) == (KNOWN_ONE_SIDED[n], KNOWN_FREE[n])
+            checks.append("ok" if ok else f"expected {KNOWN_ONE_SIDED[n]} / {KNOWN_FREE[n]}")
+        print(f"{n:2d} {one_sided:10d} {free:6d} {elapsed:7.2f}s {' '.join(checks)}")
+    if args.output:
+        pieces = piece_set(args.sizes[-1], args.reflections)
+        with open(args.output, "w") as f:
+            json.dump(pieces, f, indent=1)
+        print(f"{len(pieces)} pieces written to {args.output}")
@@ -0,0 +1,151 @@
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+
+import clingo
+
+from exact_cover import GRID_TYPES, get_pieces
+from solve_cache import SolveCache, cache_key
+from solve_stats import control_stats, enable_log, log_record
+
+def make_control(encoding, grid_type, num_hints, seed=42, arguments=()):
+    """Load and ground an encoding once through the clingo API."""
+    ctl = clingo.Control(["-c", f"grid_type={grid_type}", "-c", f"num_hints={num_hints}",
+                          f"--seed={seed}"] + list(arguments))
+    ctl.load(encoding)
+    ctl.ground([("base", [])])
+    return ctl
+
+def first_model(ctl):
+    """Solve a grounded control and return the shown atoms of the first model (or None)."""
+    with ctl.solve(yield_=True) as handle:
+        for model in handle:
+            return [str(symbol) for symbol in model.symbols(shown=True)]
+    return None
+
+def thread_arguments(threads, configuration="many"):
+    """clasp options for a competing portfolio of configurations on several threads."""
+    if threads <= 1:
+        return []
+    return [f"--parallel-mode={threads},compete", f"--configuration={configuration}"]
+
+def log_solve(solver, ctl, encoding, grid_type, num_hints, seed, ground_time, solve_time, atoms, **fields):
+    """Log the statistics of a first_model solve as a solve record."""
+    log_record(solver, encoding, GRID_TYPES[encoding][grid_type], len(get_pieces(encoding)),
+               control_stats(ctl, ground_time, solve_time), grid_type=grid_type, num_hints=num_hints,
+               seed=seed, result="SAT" if atoms is not None else "UNSAT", **fields)
+
+def solve_threads(encoding, grid_type, num_hints, seed=42, threads=1, configuration="many", cache=None):
+    """Solve with multi-threaded clasp; return (atoms, solve seconds) without grounding.
+
+    With a SolveCache the atoms of a previous solve are reused (and the seconds are
+    those of the lookup).
+    """
+    if cache is not None:
+        start_time = time.perf_counter()
+        constants = {"grid_type": grid_type, "num_hints": num_hints, "threads": threads,
+                     "configuration": configuration}
+        atoms = cache.cached(cache_key(encoding, constants, seed, 1, "portfolio"),
+                             lambda: solve_threads(encoding, grid_type, num_hints, seed, threads, configuration)[0])
+        return atoms, time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    ctl = make_control(encoding, grid_type, num_hints, seed, thread_arguments(threads, configuration))
+    ground_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    atoms = first_model(ctl)
+    solve_time = time.perf_counter() - start_time
+    log_solve("threads", ctl, encoding, grid_type, num_hints, seed, ground_time, solve_time, atoms,
+              threads=threads)
+    return atoms, solve_time
+
+def _portfolio_worker(job):
+    encoding, grid_type, num_hints, seed = job
+    start_time = time.perf_counter()
+    ctl = make_control(encoding, grid_type, num_hints, seed, ["--rand-freq=0.05"])
+    ground_time = time.perf_counter() - start_time
+    atoms = first_model(ctl)
+    elapsed = time.perf_counter() - start_time
+    log_solve("portfolio", ctl, encoding, grid_type, num_hints, seed, ground_time, elapsed - ground_time, atoms)
+    return seed, atoms, elapsed
+
+def solve_portfolio(encoding, grid_type, num_hints, seeds, processes=None, cache=None):
+    """Run differently seeded clingo processes and return the first answer as (seed, atoms, seconds).
+
+    With a SolveCache the first answer of a previous run with the same seeds is reused.
+    """
+    if cache is not None:
+        constants = {"grid_type": grid_type, "num_hints": num_hints, "processes": processes}
+        result = cache.cached(cache_key(encoding, constants, list(seeds), 1, "portfolio"),
+                              lambda: solve_portfolio(encoding, grid_type, num_hints, seeds, processes))
+        return tuple(result) if result is not None else None
+    jobs = [(encoding, grid_type, num_hints, seed) for seed in seeds]
+    pool = multiprocessing.Pool(processes or len(jobs))
+    try:
+        for result in pool.imap_unordered(_portfolio_worker, jobs):
+            if result[1] is not None:
+                return result
+        return None
+    finally:
+        pool.terminate()
+        pool.join()
+
+def report_speedup(encoding="PUZZLE_COMPLEX.lp", grid_type=1, num_hints=8, core_counts=None, runs=3):
+    """Print median solve time and speedup over one core for threads and seeded processes."""
+    if core_counts is None:
+        core_counts = [1]
+        while core_counts[-1] * 2 <= (os.cpu_count() or 1):
+            core_counts.append(core_counts[-1] * 2)
+    print(f"{encoding} grid_type={grid_type} num_hints={num_hints}, {os.cpu_count()} logical CPUs, "
+          f"median of {runs} runs")
+    print(f"{'cores':>5s} {'threads':>10s} {'speedup':>8s} {'processes':>10s} {'speedup':>8s}")
+
+    baseline = {}
+    for cores in core_counts:
+        thread_times = [solve_threads(encoding, grid_type, num_hints, 42 + run, cores)[1] for run in range(runs)]
+        process_times = []
+        for run in range(runs):
+            start_time = time.perf_counter()
+            solve_portfolio(encoding, grid_type, num_hints, [42 + run * cores + i for i in range(cores)], cores)
+            process_times.append(time.perf_counter() - start_time)
+        threads, processes = statistics.median(thread_times), statistics.median(process_times)
+        baseline.setdefault("threads", threads)
+        baseline.setdefault("processes", processes)
+        print(f"{cores:5d} {threads:9.3f}s {baseline['threads'] / threads:7.2f}x "
+              f"{processes:9.3f}s {baseline['processes'] / processes:7.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel portfolio solving with the clingo API.")
+    parser.add_argument("encoding", nargs="?", default="PUZZLE_COMPLEX.lp")
+    parser.add_argument("--grid-type", type=int, default=1)
+    parser.add_argument("--num-hints", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=None, help="solve once with this many threads")
+    parser.add_argument("--processes", type=int, default=None, help="solve once with this many seeded processes")
+    parser.add_argument("--cores", type=int, nargs="*", default=None, help="core counts for the speedup report")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--stats-log", default=None, help="append a JSON record of every solve to this file")
+    parser.add_argument("--cache", default=None,
+                        help="with --threads or --processes: directory of a solve cache shared between runs")
+    args = parser.parse_args()
+    if args.stats_log:
+        enable_log(args.stats_log)
+    cache = SolveCache(args.cache) if args.cache else None
+
+    if args.threads:
+        atoms, elapsed = solve_threads(args.encoding, args.grid_type, args.num_hints, threads=args.threads,
+                                       cache=cache)
+        print(" ".join(atoms or ["UNSATISFIABLE"]))
+        print(f"{args.threads} threads: {elapsed:.3f}s")
+    elif args.processes:
+        start_time = time.perf_counter()
+        result = solve_portfolio(args.encoding, args.grid_type, args.num_hints,
+                                 range(42, 42 + args.processes), args.processes, cache)
+        if result is None:
+            print("UNSATISFIABLE")
+        else:
+            print(" ".join(result[1]))
+            print(f"{args.processes} processes: first answer from seed {result[0]} "
+                  f"in {time.perf_counter() - start_time:.3f}s")
+    else:
+        report_speedup(args.encoding, args.grid_type, args.num_hints, args.cores, args.runs)
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from clingo_output import read_models
+from exact_cover import GRID_TYPES
+from piece_library import ROTATIONS
+from place_tetracubes import TYPE_COLORS, draw_piece, grid_segments
+
+# Per-process state: one prebuilt figure per box layout
+_WORKER = {}
+
+def sheet_from_record(record, name, box):
+    """Return a picklable sheet: name, (width, height, depth, grids) and the pieces as
+    (type, cells, grid, hint)."""
+    pieces = []
+    for p in record["pieces"]:
+        x, y, z = p["anchor"]
+        cells = [(x + dx, y + dy, z + dz) for dx, dy, dz in ROTATIONS[p["type"]][p["rotation"] - 1]]
+        pieces.append((p["type"], cells, p["grid"], p["hint"]))
+    return {"name": name, "box": box, "pieces": pieces}
+
+def sheets_from_jsonl(filename):
+    """Yield the sheets of a generate_batch.py file."""
+    with open(filename) as f:
+        for i, line in enumerate(f, 1):
+            if line.strip():
+                record = json.loads(line)
+                box = GRID_TYPES[record["encoding"]][record["grid_type"]]
+                yield sheet_from_record(record, f"{i:05d}_seed{record['seed']}", box)
+
+def sheets_from_clingo(filename, encoding="PUZZLE.lp", grid_type=1):
+    """Yield the sheets of every answer of a clingo output (text or --outf=2 JSON).
+
+    The box comes from the box/3 and grids/1 atoms (PUZZLE_INSTANCE.lp), otherwise
+    from the encoding and grid_type that produced the output.
+    """
+    for model in read_models(filename):
+        pieces = [(p.type_name, [(p.x + dx, p.y + dy, p.z + dz)
+                                 for dx, dy, dz in ROTATIONS[p.type_name][p.rotation_id - 1]], p.grid, p.hint)
+                  for p in model]
+        yield {"name": f"answer{model.number:05d}", "box": model.box or GRID_TYPES[encoding][grid_type],
+               "pieces": pieces}
+
+def init_worker(output_dir, image_format, dpi):
+    _WORKER.update(output_dir=output_dir, image_format=image_format, dpi=dpi, layouts={})
+
+def get_layout(box):
+    """Return the figure of a box layout, built once per worker: a puzzle row and a
+    solution row with one 3D axes per grid, limits and grid lines already set."""
+    if box in _WORKER["layouts"]:
+        return _WORKER["layouts"][box]
+    width, height, depth, grids = box
+    fig = plt.figure(figsize=(4 * grids, 8))
+    rows = {}
+    for row, label in enumerate(("Puzzle", "Solution")):
+        rows[label] = []
+        for grid in range(grids):
+            ax = fig.add_subplot(2, grids, row * grids + grid + 1, projection='3d')
+            ax.set_xlim([0, width])
+            ax.set_ylim([0, height])
+            ax.set_zlim([0, depth])
+            ax.set_box_aspect((width, height, depth))
+            ax.set_axis_off()
+            ax.add_collection3d(Line3DCollection(grid_segments(width, height, depth), colors='k', alpha=0.1))
+            ax.set_title(label if grids == 1 else f"{label} - grid {grid + 1}")
+            rows[label].append(ax)
+    layout = {"figure": fig, "rows": rows, "pieces": []}
+    _WORKER["layouts"][box] = layout
+    return layout
+
+def render_sheet(sheet):
+    """Worker task: draw a sheet into the layout figure of its box and save it."""
+    layout = get_layout(tuple(sheet["box"]))
+    for collection in layout["pieces"]:
+        collection.remove()
+    layout["pieces"] = []
+    for type_name, cells, grid, hint in sheet["pieces"]:
+        for label in ("Puzzle", "Solution") if hint else ("Solution",):
+            ax = layout["rows"][label][grid - 1]
+            layout["pieces"].append(draw_piece(ax, cells, TYPE_COLORS[type_name], alpha=1.0))
+    layout["figure"].suptitle(sheet["name"])
+    path = os.path.join(_WORKER["output_dir"], f"{sheet['name']}.{_WORKER['image_format']}")
+    layout["figure"].savefig(path, dpi=_WORKER["dpi"])
+    return path
+
+def render_batch(sheets, output_dir, image_format="png", dpi=80, workers=None):
+    """Render sheets over a process pool (in this process with workers=1), return the count."""
+    os.makedirs(output_dir, exist_ok=True)
+    if workers == 1:
+        init_worker(output_dir, image_format, dpi)
+        return sum(1 for _ in map(render_sheet, sheets))
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(output_dir, image_format, dpi)) as executor:
+        return sum(1 for _ in executor.map(render_sheet, sheets, chunksize=16))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render puzzle and solution sheets without a display.")
+    parser.add_argument("input", help="generate_batch.py JSONL file or clingo text output")
+    parser.add_argument("--output-dir", default="renders")
+    parser.add_argument("--format", choices=("png", "svg"), default="png")
+    parser.add_argument("--dpi", type=int, default=80)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--encoding", choices=sorted(GRID_TYPES), default="PUZZLE.lp",
+                        help="encoding of a clingo output without box/3 atoms")
+    parser.add_argument("--grid-type", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.input.endswith(".jsonl"):
+        sheets = sheets_from_jsonl(args.input)
+    else:
+        sheets = sheets_from_clingo(args.input, args.encoding, args.grid_type)
+    start_time = time.perf_counter()
+    count = render_batch(sheets, args.output_dir, args.format, args.dpi, args.workers)
+    elapsed = time.perf_counter() - start_time
+    print(f"{count} sheets rendered to {args.output_dir} in {elapsed:.2f}s "
+          f"({elapsed / max(count, 1) * 1000:.0f} ms per sheet)", file=sys.stderr)
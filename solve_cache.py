@@ -0,0 +1,202 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+INCLUDE_PATTERN = re.compile(r'^\s*#include\s+"([^"]+)"\s*\.', re.MULTILINE)
+
+# Python sources that produce the answers of a backend, besides the solver itself
+BACKEND_SOURCES = {
+    "dlx": ["exact_cover.py", "boxes.py", "placement_index.py", "piece_library.py", "draw_tetracubes.py"],
+    "two-grid": ["two_grid.py", "exact_cover.py", "boxes.py", "placement_index.py", "piece_library.py",
+                 "draw_tetracubes.py"],
+    "warm": ["warm_solver.py"],
+    "portfolio": ["portfolio.py"],
+    "instance": ["instance.py", "boxes.py", "generate_tetracubes_lp.py", "piece_library.py"]
+}
+
+# Backends that solve with the clingo Python module in this process
+MODULE_BACKENDS = ("warm", "portfolio", "instance")
+
+def program_files(encoding):
+    """Return the encoding and every file it #includes, recursively, in include order."""
+    files = []
+    todo = [encoding]
+    while todo:
+        path = todo.pop(0)
+        if path in files:
+            continue
+        files.append(path)
+        with open(path) as f:
+            text = f.read()
+        directory = os.path.dirname(path)
+        todo.extend(os.path.join(directory, name) for name in INCLUDE_PATTERN.findall(text))
+    return files
+
+@functools.lru_cache(maxsize=None)
+def clingo_binary_version():
+    """First line of the --version output of the clingo that solve_puzzle runs."""
+    from solve_puzzle import clingo_command
+
+    output = subprocess.run(clingo_command() + ["--version"], capture_output=True, text=True).stdout
+    return output.splitlines()[0] if output else "unknown clingo"
+
+def solver_version(backend):
+    """The version of the solver a backend runs (the clingo binary for the clingo backend,
+    the clingo module for the in-process ones) and a hash of its Python sources."""
+    parts = []
+    if backend == "clingo":
+        parts.append(clingo_binary_version())
+    elif backend in MODULE_BACKENDS:
+        import clingo
+        parts.append(f"clingo module {clingo.__version__}")
+    if backend in BACKEND_SOURCES:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in BACKEND_SOURCES[backend]:
+            with open(os.path.join(here, name), "rb") as f:
+                digest.update(f.read())
+        parts.append(f"{backend} {digest.hexdigest()[:16]}")
+    return ", ".join(parts)
+
+def cache_key(encoding, constants, seed, models, backend):
+    """Hash of everything that determines the answer of a solve call."""
+    digest = hashlib.sha256()
+    for path in program_files(encoding):
+        with open(path, "rb") as f:
+            digest.update(os.path.basename(path).encode() + b"\0" + f.read() + b"\0")
+    description = {"constants": sorted(constants.items()), "seed": seed, "models": models,
+                   "backend": backend, "solver": solver_version(backend)}
+    digest.update(json.dumps(description, sort_keys=True).encode())
+    return digest.hexdigest()
+
+class SolveCache:
+    """Content-addressed cache of parsed models, one JSON file per key in a directory.
+
+    Files are written to a temporary name and renamed, so workers sharing the
+    directory never read a partial entry. A hit touches the file, and once the
+    directory exceeds max_bytes the least recently used entries are removed; the size
+    is scanned once and then tracked per put, so only a put that crosses the limit
+    (by this process's count) lists the directory again.
+    hits, misses and saved_time (solve seconds not spent thanks to hits) count the
+    calls of this process.
+    """
+
+    def __init__(self, directory=".solve_cache", max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved_time = 0.0
+        self.size = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached entry of a key, or None."""
+        try:
+            with open(self.path(key)) as f:
+                entry = json.load(f)
+            os.utime(self.path(key))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry
+
+    def put(self, key, models, solve_time):
+        if self.size is None:
+            self.size = self.evict()
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"models": models, "solve_time": solve_time}, f)
+            self.size += f.tell()
+        try:
+            self.size -= os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            pass
+        os.replace(temporary, self.path(key))
+        if self.size > self.max_bytes:
+            self.size = self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the directory fits in max_bytes,
+        return the size left."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, name in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        return size
+
+    def cached(self, key, compute, keep=None):
+        """Return the value stored under key, or compute() (JSON-serializable) and store it.
+
+        A failed computation raises and stores nothing; keep(value), when given, also
+        decides whether a value is worth storing (e.g. not when a time limit ran out).
+        """
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.saved_time += entry["solve_time"]
+            return entry["models"]
+        self.misses += 1
+        start_time = time.perf_counter()
+        value = compute()
+        if keep is None or keep(value):
+            self.put(key, value, time.perf_counter() - start_time)
+        return value
+
+    def solve(self, solve_function, encoding, grid_type, num_hints, seed, models=1, backend="clingo",
+              constants=None):
+        """Return solve_function(encoding, grid_type, num_hints, seed, models, backend), cached."""
+        all_constants = dict(constants or {}, grid_type=grid_type, num_hints=num_hints)
+        key = cache_key(encoding, all_constants, seed, models, backend)
+        return self.cached(key, lambda: solve_function(encoding, grid_type, num_hints, seed, models, backend))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "saved_time": self.saved_time}
+
+def directory_summary(directory):
+    """Return (entries, bytes, total solve seconds stored) of a cache directory."""
+    entries = size = 0
+    solve_time = 0.0
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            path = os.path.join(directory, name)
+            entries += 1
+            size += os.path.getsize(path)
+            with open(path) as f:
+                solve_time += json.load(f)["solve_time"]
+    return entries, size, solve_time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear a solve cache directory.")
+    parser.add_argument("directory", nargs="?", default=".solve_cache")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    if args.clear:
+        for name in os.listdir(args.directory):
+            if name.endswith((".json", ".tmp")):
+                os.remove(os.path.join(args.directory, name))
+    entries, size, solve_time = directory_summary(args.directory)
+    print(f"{args.directory}: {entries} entries, {size / 1024:.1f} KiB, {solve_time:.2f}s of solving stored")
@@ -0,0 +1,152 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from exact_cover import GRID_TYPES, get_pieces, solve_grid_type
+from solve_cache import SolveCache
+import solve_stats
+from solve_stats import enable_log, log_record, text_stats
+from two_grid import solve_two_grids
+
+BACKENDS = ("clingo", "dlx", "two-grid")
+
+# clingo's exit codes of a completed run: satisfiable, unsatisfiable, all models found
+CLINGO_EXIT_CODES = (10, 20, 30)
+RESULT_PATTERN = re.compile(r"^(SATISFIABLE|UNSATISFIABLE|OPTIMUM FOUND)$", re.MULTILINE)
+
+def clingo_command():
+    """Return the command that starts clingo (binary if installed, Python module otherwise)."""
+    if shutil.which("clingo"):
+        return ["clingo"]
+    return [sys.executable, "-m", "clingo"]
+
+def parse_answers(output):
+    """Return the atoms of every 'Answer:' block of a clingo text output."""
+    answers = []
+    lines = output.splitlines()
+    for i, line in enumerate(lines):
+        if re.match(r"Answer: \d+", line) and i + 1 < len(lines):
+            answers.append(lines[i + 1].split())
+    return answers
+
+def solve_with_clingo(encoding, grid_type, num_hints, seed, models=1):
+    """Run the clingo encoding in a subprocess and return the shown atoms of each model.
+
+    Raises RuntimeError with clingo's messages when the run did not complete: an exit
+    code other than clingo's result codes, or no result line from python -m clingo.
+    When solve records are logged (see solve_stats), the --stats summary and the peak
+    memory of the subprocess are logged too.
+    """
+    command = clingo_command() + [encoding, "-c", f"grid_type={grid_type}",
+                                  "-c", f"num_hints={num_hints}", f"--seed={seed}",
+                                  f"--models={models}", "--stats"]
+    # stderr goes to a file so that a chatty clingo cannot block on a full pipe
+    with tempfile.TemporaryFile("w+") as errors:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors, text=True)
+        output = process.stdout.read()
+        process.stdout.close()
+        # wait4 reaps the child with its own resource usage, ru_maxrss is its peak in KiB
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        result = RESULT_PATTERN.search(output)
+        # python -m clingo exits with 0 whatever happened, only its result line tells
+        if process.returncode not in CLINGO_EXIT_CODES and not (process.returncode == 0 and result):
+            errors.seek(0)
+            raise RuntimeError(f"clingo exited with {process.returncode}: {errors.read().strip()}")
+    answers = parse_answers(output)
+    if solve_stats.logger.handlers:
+        stats = text_stats(output, usage.ru_maxrss / 1024)
+        if stats is not None:
+            known = encoding in GRID_TYPES
+            log_record("clingo", encoding, GRID_TYPES[encoding].get(grid_type) if known else None,
+                       len(get_pieces(encoding)) if known else None, stats, grid_type=grid_type,
+                       num_hints=num_hints, seed=seed,
+                       result="UNSAT" if result and result.group(1) == "UNSATISFIABLE" else "SAT")
+    return answers
+
+def solve(encoding="PUZZLE.lp", grid_type=1, num_hints=6, seed=42, models=1, backend="clingo", cache=None):
+    """Solve one puzzle instance with the selected backend (through a SolveCache if given)."""
+    if cache is not None:
+        return cache.solve(solve, encoding, grid_type, num_hints, seed, models, backend)
+    if backend == "two-grid":
+        if grid_type != 3:
+            raise ValueError("the two-grid backend only solves grid_type 3")
+        atoms, _ = solve_two_grids(encoding, num_hints, seed)
+        return [atoms] if atoms else []
+    if backend == "dlx":
+        return solve_grid_type(encoding, grid_type, num_hints, seed, models)
+    return solve_with_clingo(encoding, grid_type, num_hints, seed, models)
+
+def print_answers(answers, encoding):
+    """Print models in clingo's text format so place_tetracubes.py can read them."""
+    print(f"Reading from {encoding}")
+    print("Solving...")
+    for i, atoms in enumerate(answers, 1):
+        print(f"Answer: {i}")
+        print(" ".join(atoms))
+    print("SATISFIABLE" if answers else "UNSATISFIABLE")
+
+def compare_backends(encoding, grid_type, num_hints, seed, num_runs=5):
+    """Time every backend on the same instance and print the average wall time."""
+    print(f"=== {encoding} grid_type={grid_type} num_hints={num_hints} seed={seed} ===")
+    averages = {}
+    for backend in BACKENDS:
+        if backend == "two-grid" and grid_type != 3:
+            continue
+        times = []
+        for _ in range(num_runs):
+            start_time = time.perf_counter()
+            answers = solve(encoding, grid_type, num_hints, seed, 1, backend)
+            times.append(time.perf_counter() - start_time)
+        averages[backend] = statistics.mean(times)
+        status = "SAT" if answers else "UNSAT"
+        print(f"  {backend:8s} {status:5s} average {averages[backend] * 1000:8.1f} ms "
+              f"(median {statistics.median(times) * 1000:.1f} ms)")
+    print(f"  dlx speedup: {averages['clingo'] / averages['dlx']:.1f}x")
+    return averages
+
+def parse_constants(constants):
+    """Turn ['grid_type=1', ...] into a dict of integers."""
+    values = {}
+    for constant in constants:
+        name, value = constant.split("=")
+        values[name] = int(value)
+    return values
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a tetracube puzzle with clingo or a native backend.")
+    parser.add_argument("encoding", choices=sorted(GRID_TYPES))
+    parser.add_argument("-c", dest="constants", action="append", default=[],
+                        help="constant as in clingo, e.g. -c grid_type=1 -c num_hints=6")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--models", type=int, default=1)
+    parser.add_argument("--backend", choices=BACKENDS, default="clingo")
+    parser.add_argument("--compare", action="store_true",
+                        help="time every backend on the same instance instead of printing models")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cache", default=None, help="directory of a solve cache shared between runs")
+    parser.add_argument("--stats-log", default=None, help="append a JSON record of every clingo solve to this file")
+    args = parser.parse_args()
+    if args.stats_log:
+        enable_log(args.stats_log)
+
+    constants = parse_constants(args.constants)
+    grid_type = constants.get("grid_type", 1)
+    num_hints = constants.get("num_hints", 6 if args.encoding == "PUZZLE.lp" else 8)
+
+    if args.compare:
+        compare_backends(args.encoding, grid_type, num_hints, args.seed, args.runs)
+    else:
+        cache = SolveCache(args.cache) if args.cache else None
+        print_answers(solve(args.encoding, grid_type, num_hints, args.seed, args.models, args.backend, cache),
+                      args.encoding)
+        if cache is not None:
+            stats = cache.stats()
+            print(f"cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['saved_time']:.3f}s of solving saved", file=sys.stderr)
@@ -0,0 +1,160 @@
+import argparse
+import json
+import logging
+import math
+import re
+import resource
+import statistics
+import sys
+from collections import defaultdict
+
+# Quantities of one solve, aggregated per instance; times in seconds, peak_memory in MiB.
+# peak_memory is known only for clingo subprocesses; in-process solves record the
+# high-water mark of the whole process instead, as process_peak_memory, which only
+# grows and so is not aggregated
+STAT_FIELDS = ("ground_time", "solve_time", "first_model_time", "atoms", "rules", "choices", "conflicts",
+               "restarts", "peak_memory")
+
+# Fields of a record that identify the instance it solved, and the solve path
+INSTANCE_FIELDS = ("solver", "encoding", "box", "pieces")
+
+# Structured records of every solve; off until enable_log attaches a handler
+logger = logging.getLogger("tetracubes.solve")
+logger.propagate = False
+
+# Lines of clingo's --stats text output, as (field, pattern)
+TEXT_PATTERNS = [
+    ("time", re.compile(r"^Time\s*:\s*([\d.]+)s \(Solving: ([\d.]+)s 1st Model: ([\d.]+)s", re.MULTILINE)),
+    ("models", re.compile(r"^Models\s*:\s*(\d+)", re.MULTILINE)),
+    ("choices", re.compile(r"^Choices\s*:\s*(\d+)", re.MULTILINE)),
+    ("conflicts", re.compile(r"^Conflicts\s*:\s*(\d+)", re.MULTILINE)),
+    ("restarts", re.compile(r"^Restarts\s*:\s*(\d+)", re.MULTILINE)),
+    ("atoms", re.compile(r"^Atoms\s*:\s*(\d+)", re.MULTILINE)),
+    ("rules", re.compile(r"^Rules\s*:\s*\d+\s*\(Original: (\d+)\)", re.MULTILINE)),
+]
+
+def peak_memory(children=False):
+    """Peak resident memory in MiB of this process (or of its largest waited-for child).
+
+    The peak only grows, so in a long-running process it is the peak of the largest
+    solve so far rather than of the last one.
+    """
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return usage.ru_maxrss / 1024
+
+def control_stats(ctl, ground_time, solve_time):
+    """Return the STAT_FIELDS of the last solve of a clingo.Control, with
+    process_peak_memory in place of peak_memory.
+
+    atoms and rules count the whole ground program (in multi-shot solving, everything
+    grounded so far); choices, conflicts and restarts the search of the last solve
+    call. first_model_time is None when no model was found.
+    """
+    stats = ctl.statistics
+    lp = stats["problem"]["lp"]
+    solvers = stats["solving"]["solvers"]
+    summary = stats["summary"]
+    return {
+        "ground_time": ground_time,
+        "solve_time": solve_time,
+        "first_model_time": summary["times"]["sat"] if summary["models"]["enumerated"] else None,
+        "atoms": int(lp["atoms"]),
+        "rules": int(lp["rules"]),
+        "choices": int(solvers["choices"]),
+        "conflicts": int(solvers["conflicts"]),
+        "restarts": int(solvers["restarts"]),
+        "process_peak_memory": peak_memory()
+    }
+
+def text_stats(output, memory=None):
+    """Return the STAT_FIELDS of a clingo --stats text output.
+
+    clingo prints no separate grounding time, so ground_time is the total time minus
+    the solving time (grounding and preprocessing). memory is the peak of the clingo
+    process, when the caller measured it.
+    """
+    values = {}
+    for field, pattern in TEXT_PATTERNS:
+        match = pattern.search(output)
+        if match:
+            values[field] = match.groups()
+    if "time" not in values:
+        return None
+    total, solving, first_model = map(float, values["time"])
+    return {
+        "ground_time": total - solving,
+        "solve_time": solving,
+        "first_model_time": first_model if int(values.get("models", ("0",))[0]) else None,
+        **{field: int(values[field][0]) for field in ("atoms", "rules", "choices", "conflicts", "restarts")
+           if field in values},
+        "peak_memory": memory
+    }
+
+def log_record(solver, encoding, box, pieces, stats, **fields):
+    """Log one solve as a structured record and return it.
+
+    solver names the solve path, box is (width, height, depth, grids) and pieces the
+    number of pieces, both None when unknown; further fields (grid_type, num_hints,
+    seed, result, ...) are kept as given.
+    """
+    record = {"solver": solver, "encoding": encoding, "box": list(box) if box else None, "pieces": pieces,
+              **fields, **stats}
+    if logger.handlers:
+        logger.info(json.dumps(record))
+    return record
+
+def enable_log(filename):
+    """Append every solve record of this process to filename, one JSON object per line."""
+    handler = logging.FileHandler(filename)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+def read_records(filename):
+    with open(filename) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def instance_report(records):
+    """Aggregate records per instance and solve path: one row with the number of solves
+    and the median of every STAT_FIELD, sorted by the number of cells of the instance."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[tuple(json.dumps(record[field]) for field in INSTANCE_FIELDS)].append(record)
+    rows = []
+    for key, group in groups.items():
+        row = dict(zip(INSTANCE_FIELDS, map(json.loads, key)), solves=len(group))
+        for field in STAT_FIELDS:
+            values = [record[field] for record in group if record.get(field) is not None]
+            row[field] = statistics.median(values) if values else None
+        rows.append(row)
+    return sorted(rows, key=lambda row: (math.prod(row["box"] or [0]), row["pieces"] or 0, row["solver"]))
+
+def format_value(value, field):
+    if value is None:
+        return "-"
+    if field.endswith("_time"):
+        return f"{value:.3f}s"
+    if field.endswith("peak_memory"):
+        return f"{value:.0f}M"
+    return f"{value:.0f}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate logged solve records into per-instance reports.")
+    parser.add_argument("log", help="JSON lines written with --stats-log")
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON lines")
+    args = parser.parse_args()
+
+    rows = instance_report(read_records(args.log))
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+        sys.exit()
+    print(f"{'solver':10s} {'encoding':22s} {'box':>9s} {'pieces':>6s} {'solves':>6s} "
+          + " ".join(f"{field:>{max(9, len(field))}s}" for field in STAT_FIELDS))
+    for row in rows:
+        box = "-"
+        if row["box"]:
+            box = "x".join(map(str, row["box"][:3])) + (f"*{row['box'][3]}" if row["box"][3] > 1 else "")
+        pieces = "-" if row["pieces"] is None else str(row["pieces"])
+        print(f"{row['solver']:10s} {row['encoding']:22s} {box:>9s} {pieces:>6s} {row['solves']:6d} "
+              + " ".join(f"{format_value(row[field], field):>{max(9, len(field))}s}" for field in STAT_FIELDS))
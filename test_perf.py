@@ -1,153 +1,330 @@
-import subprocess
-import time
-import statistics
+import argparse
+import hashlib
+import itertools
+import json
+import math
 import os
-import matplotlib.pyplot as plt
-import numpy as np
-
-def run_command_and_measure(command, num_runs=5):
-    """Run a command multiple times and measure execution time"""
-    times = []
-    
-    print(f"Running command: {command}")
-    for i in range(num_runs):
-        print(f"  Run {i+1}/{num_runs}...", end="", flush=True)
-        start_time = time.time()
-        
-        # Run the command and redirect output to a temporary file
-        with open("temp_solution.txt", "w") as outfile:
-            process = subprocess.run(command, shell=True, stdout=outfile, stderr=subprocess.PIPE)
-        
-        elapsed_time = time.time() - start_time
-        times.append(elapsed_time)
-        print(f" {elapsed_time:.3f} seconds")
-        
-        # Check if the command was successful
-        if process.returncode != 0:
-            print(f"  Error in run {i+1}: {process.stderr.decode('utf-8')}")
-            # Continue with the next run instead of stopping
-    
-    # Clean up temporary file
-    if os.path.exists("temp_solution.txt"):
-        os.remove("temp_solution.txt")
-        
-    return times
-
-def create_comparison_plots(times_list, cmd_names, cells_info, tetracubes_info):
-    """Create comparison plots for the execution times"""
-    # Calculate statistics
-    avgs = [statistics.mean(times) for times in times_list]
-    
-    # Create figure with multiple subplots
-    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 6))
-    
-    # 1. Bar chart for average times
-    bars = ax1.bar(cmd_names, avgs, color=['#3498db', '#e74c3c'])
-    ax1.set_ylabel('Time (seconds)')
-    ax1.set_title('Average Execution Time')
-    
-    # Add values on top of bars
-    for i, v in enumerate(avgs):
-        ax1.text(i, v + 0.1, f"{v:.3f}s", ha='center')
-    
-    # 2. Box plot for distribution
-    ax2.boxplot(times_list, labels=cmd_names)
-    ax2.set_ylabel('Time (seconds)')
-    ax2.set_title('Execution Time Distribution')
-    
-    # 3. Line plot for individual runs
-    runs = list(range(1, len(times_list[0]) + 1))
-    colors = ['#3498db', '#e74c3c']
-    
-    for i, times in enumerate(times_list):
-        ax3.plot(runs, times, 'o-', label=f"{cmd_names[i]}", color=colors[i])
-    
-    ax3.set_xlabel('Run Number')
-    ax3.set_ylabel('Time (seconds)')
-    ax3.set_title('Execution Time per Run')
-    ax3.legend()
-    ax3.grid(True, linestyle='--', alpha=0.7)
-    
-    # Add overall title with cell and tetracube info
-    plt.suptitle(f'Performance Comparison: PUZZLE.lp ({cells_info[0]} cells, {tetracubes_info[0]} tetracubes) vs ' +
-                f'PUZZLE_COMPLEX.lp ({cells_info[1]} cells, {tetracubes_info[1]} tetracubes)', fontsize=14)
-    plt.tight_layout()
-    plt.subplots_adjust(top=0.88)
-    
-    # Save the figure
-    plt.savefig('clingo_performance_comparison.png', dpi=300)
-    print("\nGraph saved as 'clingo_performance_comparison.png'")
-    
-    # Show the plot
-    plt.show()
-
-def main():
-    # Commands to compare - adding output redirection to solution.txt
-    cmd1 = "clingo PUZZLE.lp -c grid_type=3 -c num_hints=3 --seed=42"
-    cmd2 = "clingo PUZZLE_COMPLEX.lp -c grid_type=3 -c num_hints=3 --seed=42"
-    
-    cmd1_name = "PUZZLE.lp"
-    cmd2_name = "PUZZLE_COMPLEX.lp"
-    
-    # Information about cells and tetracubes for each command
-    cells_info = [32, 64]  # 32 cells for PUZZLE.lp, 64 cells for PUZZLE_COMPLEX.lp
-    tetracubes_info = [8, 16]  # 8 tetracubes for PUZZLE.lp, 16 tetracubes for PUZZLE_COMPLEX.lp
-    
-    # Number of runs for each command
-    num_runs = 20
-    
-    print("=== Performance Comparison ===")
-    print(f"Each command will be run {num_runs} times\n")
-    
-    # Run first command
-    print("\n=== Command 1 ===")
-    times1 = run_command_and_measure(cmd1, num_runs)
-    
-    # Run second command
-    print("\n=== Command 2 ===")
-    times2 = run_command_and_measure(cmd2, num_runs)
-    
-    # Calculate statistics
-    avg1 = statistics.mean(times1)
-    avg2 = statistics.mean(times2)
-    
-    median1 = statistics.median(times1)
-    median2 = statistics.median(times2)
-    
-    if len(times1) > 1:
-        stdev1 = statistics.stdev(times1)
-        stdev2 = statistics.stdev(times2)
-    else:
-        stdev1 = stdev2 = 0
-    
-    # Print results
-    print("\n=== Results ===")
-    print(f"Command 1 ({cmd1_name}) - {cells_info[0]} cells, {tetracubes_info[0]} tetracubes:")
-    print(f"  Average: {avg1:.3f} seconds")
-    print(f"  Median: {median1:.3f} seconds")
-    print(f"  Std Dev: {stdev1:.3f} seconds")
-    print(f"  All times: {[round(t, 3) for t in times1]}")
-    
-    print(f"\nCommand 2 ({cmd2_name}) - {cells_info[1]} cells, {tetracubes_info[1]} tetracubes:")
-    print(f"  Average: {avg2:.3f} seconds")
-    print(f"  Median: {median2:.3f} seconds")
-    print(f"  Std Dev: {stdev2:.3f} seconds")
-    print(f"  All times: {[round(t, 3) for t in times2]}")
-    
-    # Compare
-    ratio = avg2 / avg1 if avg1 > 0 else float('inf')
-    diff = avg2 - avg1
-    
-    print("\n=== Comparison ===")
-    if avg1 < avg2:
-        print(f"{cmd1_name} is faster than {cmd2_name} by {diff:.3f} seconds ({ratio:.2f}x)")
-    elif avg2 < avg1:
-        print(f"{cmd2_name} is faster than {cmd1_name} by {-diff:.3f} seconds ({1/ratio:.2f}x)")
-    else:
-        print(f"{cmd1_name} and {cmd2_name} have the same average execution time")
-    
-    # Create and display comparison plots
-    create_comparison_plots([times1, times2], [cmd1_name, cmd2_name], cells_info, tetracubes_info)
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from exact_cover import GRID_TYPES, get_pieces
+from solve_cache import program_files
+from solve_stats import control_stats, enable_log, log_record
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Named clasp configurations of the matrix; "default" is clingo's own choice
+SOLVER_CONFIGS = {
+    "default": [],
+    "frumpy": ["--configuration=frumpy"],
+    "jumpy": ["--configuration=jumpy"],
+    "tweety": ["--configuration=tweety"],
+    "crafty": ["--configuration=crafty"],
+    "trendy": ["--configuration=trendy"],
+    "handy": ["--configuration=handy"],
+    "rand": ["--rand-freq=0.05"]
+}
+
+# Fields that identify a cell of the matrix; runs of the same cell are compared
+CELL_FIELDS = ("encoding", "grid_type", "num_hints", "seed", "config")
+METRICS = ("total_ns", "ground_ns", "solve_ns")
+
+def time_solve(encoding, grid_type, num_hints, seed, config="default", time_limit=None):
+    """Ground and solve an encoding once in this process, timed with perf_counter_ns.
+
+    Returns the ground, solve and total nanoseconds, the solve_stats.STAT_FIELDS and the
+    result ("SAT", "UNSAT", or "UNKNOWN" when time_limit seconds ran out); loading clingo
+    and starting a process are not part of the time.
+    """
+    import clingo
+
+    start_time = time.perf_counter_ns()
+    ctl = clingo.Control(["-c", f"grid_type={grid_type}", "-c", f"num_hints={num_hints}",
+                          f"--seed={seed}"] + SOLVER_CONFIGS[config])
+    ctl.load(os.path.join(HERE, encoding))
+    ctl.ground([("base", [])])
+    ground_end = time.perf_counter_ns()
+    with ctl.solve(async_=True) as handle:
+        if not handle.wait(time_limit):
+            handle.cancel()
+            result = "UNKNOWN"
+        else:
+            result = "SAT" if handle.get().satisfiable else "UNSAT"
+    end_time = time.perf_counter_ns()
+    stats = control_stats(ctl, (ground_end - start_time) / 1e9, (end_time - ground_end) / 1e9)
+    log_record("test_perf", encoding, GRID_TYPES[encoding][grid_type], len(get_pieces(encoding)), stats,
+               grid_type=grid_type, num_hints=num_hints, seed=seed, config=config, result=result)
+    return dict(stats, ground_ns=ground_end - start_time, solve_ns=end_time - ground_end,
+                total_ns=end_time - start_time, result=result)
+
+def matrix_cells(encodings, grid_types, num_hints, seeds, configs):
+    """Yield every cell of the matrix as a dict of CELL_FIELDS, skipping grid_types an
+    encoding does not have and hint counts above its number of pieces."""
+    for encoding, grid_type, hints, seed, config in itertools.product(encodings, grid_types, num_hints,
+                                                                      seeds, configs):
+        if grid_type in GRID_TYPES[encoding] and hints <= len(get_pieces(encoding)):
+            yield dict(zip(CELL_FIELDS, (encoding, grid_type, hints, seed, config)))
+
+def run_matrix(cells, runs=10, warmup=1, time_limit=None):
+    """Time every cell warmup + runs times and yield one record per measured run.
+
+    Every pass times each cell once, so that slow drift of the machine (thermal
+    throttling, other load) is spread over all cells instead of hitting the last ones.
+    """
+    cells = [(cell, [cell[field] for field in CELL_FIELDS]) for cell in cells]
+    for _ in range(warmup):
+        for _, args in cells:
+            time_solve(*args, time_limit=time_limit)
+    for run in range(runs):
+        for cell, args in cells:
+            yield dict(cell, run=run, **time_solve(*args, time_limit=time_limit))
+
+def environment(encodings):
+    """What a result file was measured on, so that two files can be checked for comparability."""
+    import clingo
+
+    digests = {}
+    for encoding in encodings:
+        digest = hashlib.sha256()
+        for path in program_files(os.path.join(HERE, encoding)):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digests[encoding] = digest.hexdigest()[:16]
+    return {"clingo": clingo.__version__, "python": platform.python_version(), "machine": platform.machine(),
+            "cpu_count": os.cpu_count(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "encodings": digests}
+
+def load_results(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+def _count_u(m, n, cache={}):
+    """Number of orderings of m + n distinct values per Mann-Whitney U statistic."""
+    if (m, n) not in cache:
+        if m == 0 or n == 0:
+            cache[m, n] = [1]
+        else:
+            # The largest value is either one of the m (adds n to U) or one of the n
+            with_m, with_n = _count_u(m - 1, n), _count_u(m, n - 1)
+            counts = [0] * (m * n + 1)
+            for u, count in enumerate(with_m):
+                counts[u + n] += count
+            for u, count in enumerate(with_n):
+                counts[u] += count
+            cache[m, n] = counts
+    return cache[m, n]
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test of two samples, return (U of a, p-value).
+
+    Exact for small samples without ties, otherwise the normal approximation with tie
+    and continuity correction.
+    """
+    m, n = len(a), len(b)
+    values = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(values)
+    ties = 0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    u = sum(rank for rank, (_, sample) in zip(ranks, values) if sample == 0) - m * (m + 1) / 2
+    if m == 0 or n == 0:
+        return u, 1.0
+    if ties == 0 and m + n <= 30:
+        counts = _count_u(m, n)
+        extreme = min(u, m * n - u)
+        tail = sum(counts[:int(extreme) + 1]) / math.comb(m + n, m)
+        return u, min(1.0, 2 * tail)
+    variance = m * n / 12 * ((m + n + 1) - ties / ((m + n) * (m + n - 1)))
+    if variance == 0:
+        return u, 1.0
+    z = (abs(u - m * n / 2) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+def group_runs(results, metric):
+    """{cell tuple: [metric of every run]} of a result file, without the runs that
+    timed out (their time is only the time limit)."""
+    groups = defaultdict(list)
+    for run in results["runs"]:
+        if run.get("result") != "UNKNOWN":
+            groups[tuple(run[field] for field in CELL_FIELDS)].append(run[metric])
+    return groups
+
+def group_results(results):
+    """{cell tuple: set of the results ("SAT", "UNSAT", "UNKNOWN") of its runs} of a result file."""
+    groups = defaultdict(set)
+    for run in results["runs"]:
+        groups[tuple(run[field] for field in CELL_FIELDS)].add(run.get("result"))
+    return groups
+
+def smallest_p(m, n):
+    """Smallest two-sided p-value the exact Mann-Whitney test can give for samples of m and n."""
+    return min(1.0, 2 / math.comb(m + n, m)) if m and n else 1.0
+
+def holm(p_values):
+    """Holm-Bonferroni adjusted p-values, so that testing many cells at once does not
+    flag one cell in every 1/alpha by chance."""
+    order = sorted(range(len(p_values)), key=p_values.__getitem__)
+    adjusted = [1.0] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+def compare(baseline, candidate, metric="total_ns", alpha=0.05, threshold=0.05):
+    """Compare the cells two result files have in common, one row per cell.
+
+    A cell is a regression (or improvement) when the Mann-Whitney test, Holm-adjusted
+    over all cells, rejects equal distributions at alpha and the median moved by more
+    than threshold. Runs that timed out are left out of the test; a cell whose runs
+    got different results in the two files is flagged "results differ" instead, and a
+    cell with no run left in either file "timed out". smallest_p is the smallest
+    p-value the cell's sample sizes allow (see reachable).
+    """
+    old, new = group_runs(baseline, metric), group_runs(candidate, metric)
+    old_results, new_results = group_results(baseline), group_results(candidate)
+    rows = []
+    for cell in old_results:
+        if cell not in new_results:
+            continue
+        row = dict(zip(CELL_FIELDS, cell), old_ms=None, new_ms=None, ratio=None, p=1.0, smallest_p=1.0,
+                   results_differ=old_results[cell] != new_results[cell])
+        if old[cell] and new[cell]:
+            old_median, new_median = statistics.median(old[cell]), statistics.median(new[cell])
+            _, p = mann_whitney(old[cell], new[cell])
+            row.update(old_ms=old_median / 1e6, new_ms=new_median / 1e6,
+                       ratio=new_median / old_median if old_median else math.inf, p=p,
+                       smallest_p=smallest_p(len(old[cell]), len(new[cell])))
+        rows.append(row)
+    for row, adjusted in zip(rows, holm([row["p"] for row in rows])):
+        row["p_adjusted"] = adjusted
+        row["verdict"] = ""
+        if row["results_differ"]:
+            row["verdict"] = "results differ"
+        elif row["ratio"] is None:
+            row["verdict"] = "timed out"
+        elif adjusted < alpha and row["ratio"] > 1 + threshold:
+            row["verdict"] = "regression"
+        elif adjusted < alpha and row["ratio"] < 1 - threshold:
+            row["verdict"] = "improvement"
+    return rows
+
+def reachable(rows, alpha=0.05):
+    """Whether any cell of compare's rows can be significant at alpha at all.
+
+    Holm multiplies the smallest p-value by the number of cells, so with few runs per
+    cell (5 runs give at best p = 2/252) a large matrix can never flag anything.
+    """
+    return any(len(rows) * row["smallest_p"] < alpha for row in rows)
+
+def plot_results(results, filename, metric="total_ns"):
+    """Box plot of the metric per cell, one box per cell of the result file."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    groups = group_runs(results, metric)
+    labels = [f"{e.split('.')[0]} g{g} h{h} s{s} {c}" for e, g, h, s, c in groups]
+    fig, ax = plt.subplots(figsize=(max(6, len(groups) * 0.8), 6))
+    ax.boxplot([[v / 1e6 for v in runs] for runs in groups.values()])
+    ax.set_xticks(range(1, len(labels) + 1), labels, rotation=60, ha="right")
+    ax.set_ylabel(f"{metric[:-3]} time (ms)")
+    fig.tight_layout()
+    fig.savefig(filename, dpi=150)
+
+def main_run(args):
+    if args.stats_log:
+        enable_log(args.stats_log)
+    cells = list(matrix_cells(args.encodings, args.grid_types, args.num_hints, args.seeds, args.configs))
+    print(f"{len(cells)} cells x ({args.warmup} warmup + {args.runs} runs)", file=sys.stderr)
+    runs = []
+    for record in run_matrix(cells, args.runs, args.warmup, args.time_limit):
+        runs.append(record)
+        if len(runs) % len(cells) == 0:
+            print(f"pass {record['run'] + 1}/{args.runs} done", file=sys.stderr)
+    for cell, times in group_runs({"runs": runs}, "total_ns").items():
+        encoding, grid_type, num_hints, seed, config = cell
+        print(f"{encoding:18s} grid {grid_type} hints {num_hints:2d} seed {seed:4d} {config:8s} "
+              f"median {statistics.median(times) / 1e6:9.1f} ms", file=sys.stderr)
+    results = {"environment": environment(args.encodings), "runs_per_cell": args.runs, "warmup": args.warmup,
+               "runs": runs}
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"{len(runs)} runs written to {args.output}", file=sys.stderr)
+
+def main_compare(args):
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    for key in ("clingo", "machine", "cpu_count"):
+        if baseline["environment"].get(key) != candidate["environment"].get(key):
+            print(f"warning: {key} differs ({baseline['environment'].get(key)} vs "
+                  f"{candidate['environment'].get(key)})", file=sys.stderr)
+    rows = compare(baseline, candidate, args.metric, args.alpha, args.threshold)
+    powered = reachable(rows, args.alpha)
+    # Without the power to flag timings, only the cells whose results changed are worth showing
+    shown = rows if powered else [row for row in rows if row["results_differ"]]
+    if shown:
+        print(f"{'encoding':18s} {'grid':>4s} {'hints':>5s} {'seed':>5s} {'config':8s} "
+              f"{'old ms':>9s} {'new ms':>9s} {'ratio':>6s} {'p':>7s} {'p adj':>7s}")
+    for row in shown:
+        times = " ".join(f"{'-':>{width}s}" if value is None else f"{value:{width}.{digits}f}"
+                         for value, width, digits in ((row["old_ms"], 9, 1), (row["new_ms"], 9, 1),
+                                                      (row["ratio"], 6, 2)))
+        print(f"{row['encoding']:18s} {row['grid_type']:4d} {row['num_hints']:5d} {row['seed']:5d} "
+              f"{row['config']:8s} {times} {row['p']:7.4f} {row['p_adjusted']:7.4f} {row['verdict']}")
+    differing = sum(row["results_differ"] for row in rows)
+    if rows and not powered:
+        print(f"error: with these runs per cell no cell out of {len(rows)} can reach alpha={args.alpha} "
+              f"after the Holm correction, measure more runs or fewer cells; "
+              f"{differing} with different results", file=sys.stderr)
+        sys.exit(1 if differing else 2)
+    regressions = sum(row["verdict"] == "regression" for row in rows)
+    print(f"{len(rows)} cells compared, {regressions} regressions, {differing} with different results",
+          file=sys.stderr)
+    sys.exit(1 if regressions or differing else 0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Benchmark the encodings over a matrix and compare result files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time a matrix of encodings x grid_types x num_hints x seeds x configs")
+    run.add_argument("--encodings", nargs="+", choices=sorted(GRID_TYPES), default=["PUZZLE.lp", "PUZZLE_COMPLEX.lp"])
+    run.add_argument("--grid-types", type=int, nargs="+", default=[1, 2, 3])
+    run.add_argument("--num-hints", type=int, nargs="+", default=[3])
+    run.add_argument("--seeds", type=int, nargs="+", default=[42])
+    run.add_argument("--configs", nargs="+", choices=list(SOLVER_CONFIGS), default=["default"])
+    run.add_argument("--runs", type=int, default=10,
+                     help="measured runs per cell (5 are too few to flag anything in a matrix of 7 cells or more)")
+    run.add_argument("--warmup", type=int, default=1, help="unmeasured runs per cell before the measured ones")
+    run.add_argument("--time-limit", type=float, default=None, help="seconds per solve")
+    run.add_argument("--output", default="perf_results.json")
+    run.add_argument("--stats-log", default=None, help="also append a JSON record of every solve to this file")
+
+    cmp = commands.add_parser("compare", help="flag significant changes between two result files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("candidate")
+    cmp.add_argument("--metric", choices=METRICS, default="total_ns")
+    cmp.add_argument("--alpha", type=float, default=0.05, help="significance level of the Mann-Whitney test")
+    cmp.add_argument("--threshold", type=float, default=0.05, help="smallest relative change of the median to flag")
+
+    plot = commands.add_parser("plot", help="box plot of a result file")
+    plot.add_argument("results")
+    plot.add_argument("--output", default="clingo_performance_comparison.png")
+    plot.add_argument("--metric", choices=METRICS, default="total_ns")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        main_run(args)
+    elif args.command == "compare":
+        main_compare(args)
+    else:
+        plot_results(load_results(args.results), args.output, args.metric)
+        print(f"Graph saved as '{args.output}'")
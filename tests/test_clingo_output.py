@@ -0,0 +1,58 @@
+import io
+import json
+import os
+
+from clingo_output import read_models
+from exact_cover import solve_grid_type
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def answers(encoding, grid_type, count=2):
+    return [solve_grid_type(encoding, grid_type, 2, seed)[0] for seed in range(count)]
+
+def text_output(models):
+    lines = ["pyclingo version 5.8.2", "Reading from PUZZLE.lp", "Solving..."]
+    for number, atoms in enumerate(models, 1):
+        lines += [f"Answer: {number} (Time: 0.062s)", " ".join(atoms)]
+    return "\n".join(lines + ["SATISFIABLE", "", "Models       : 2+"]) + "\n"
+
+def json_output(models):
+    witnesses = [{"Time": 0.09, "Value": atoms} for atoms in models]
+    return json.dumps({"Solver": "pyclingo version 5.8.2", "Call": [{"Witnesses": witnesses}],
+                       "Result": "SATISFIABLE"}, indent=2) + "\n"
+
+def check(models, atoms):
+    assert [model.number for model in models] == list(range(1, len(atoms) + 1))
+    for model, shown in zip(models, atoms):
+        positions = [atom for atom in shown if atom.startswith("fullPosition(")]
+        assert len(model) == len(positions)
+        assert len(model.puzzle) == 2
+        assert all(piece.hint == (piece in set(model.puzzle)) for piece in model)
+
+def test_text_output():
+    for encoding, grid_type in (("PUZZLE.lp", 1), ("PUZZLE_COMPLEX.lp", 3)):
+        atoms = answers(encoding, grid_type)
+        check(list(read_models(io.StringIO(text_output(atoms)))), atoms)
+
+def test_json_output():
+    for encoding, grid_type in (("PUZZLE.lp", 3), ("PUZZLE_COMPLEX.lp", 1)):
+        atoms = answers(encoding, grid_type)
+        check(list(read_models(io.StringIO(json_output(atoms)))), atoms)
+
+def test_text_and_json_agree():
+    atoms = answers("PUZZLE_COMPLEX.lp", 3)
+    from_text = read_models(io.StringIO(text_output(atoms)))
+    from_json = read_models(io.StringIO(json_output(atoms)))
+    for text_model, json_model in zip(from_text, from_json):
+        assert list(text_model) == list(json_model)
+
+def test_solution_file():
+    models = list(read_models(os.path.join(ROOT, "solution.txt")))
+    assert len(models) == 1
+    pieces = list(models[0])
+    assert [piece.type_name for piece in pieces] == ["I", "T", "L", "Pyramid", "O", "N", "Z", "Z_mirror"]
+    assert [piece.piece for piece in models[0].puzzle] == [1, 2, 5]
+    assert pieces[0][:6] == (1, "I", 3, 0, 0, 0)
+
+def test_empty_output():
+    assert list(read_models(io.StringIO("\n"))) == []
@@ -0,0 +1,22 @@
+import pytest
+
+from count_tilings import count_exact_covers, count_tilings
+from exact_cover import GRID_TYPES, build_matrix, get_pieces
+
+@pytest.mark.parametrize("grid_type, raw, classes", [(1, 11120, 1390), (2, 1792, 224), (3, 1280, 10)])
+def test_puzzle_counts(grid_type, raw, classes):
+    assert count_tilings("PUZZLE.lp", grid_type)[:2] == (raw, classes)
+
+@pytest.mark.parametrize("grid_type", [2, 3])
+def test_counts_match_dlx_enumeration(grid_type):
+    matrix, _ = build_matrix(*GRID_TYPES["PUZZLE.lp"][grid_type], get_pieces("PUZZLE.lp"))
+    assert len(matrix.solve(0)) == count_tilings("PUZZLE.lp", grid_type)[0]
+
+def test_max_states():
+    with pytest.raises(MemoryError):
+        count_tilings("PUZZLE.lp", 1, max_states=10)
+
+def test_domino_strip():
+    # A 1 x 4 strip with two dominoes (one type, two copies) has a single tiling
+    rows = [(0, 1, 0b0011), (0, 1, 0b0110), (0, 1, 0b1100)]
+    assert count_exact_covers(rows, 4, [2])[0] == 1
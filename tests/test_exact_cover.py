@@ -0,0 +1,29 @@
+from collections import Counter
+
+import pytest
+
+from clingo_output import parse_model
+from exact_cover import GRID_TYPES, get_pieces, solve_grid_type
+from piece_library import ROTATIONS
+
+@pytest.mark.parametrize("encoding, grid_type",
+                         [(encoding, grid_type) for encoding in GRID_TYPES for grid_type in GRID_TYPES[encoding]])
+def test_solve_grid_type_tiles_the_box(encoding, grid_type):
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    atoms = solve_grid_type(encoding, grid_type, 3, seed=7)[0]
+    model = parse_model(1, " ".join(atoms))
+
+    cells = []
+    for piece in model:
+        for dx, dy, dz in ROTATIONS[piece.type_name][piece.rotation_id - 1]:
+            x, y, z = piece.x + dx, piece.y + dy, piece.z + dz
+            assert 0 <= x < width and 0 <= y < height and 0 <= z < depth
+            assert 1 <= piece.grid <= grids
+            cells.append((x, y, z, piece.grid))
+    assert len(cells) == len(set(cells)) == width * height * depth * grids
+    assert Counter(piece.type_name for piece in model) == Counter(t for _, t in get_pieces(encoding))
+    assert sum(piece.hint for piece in model) == 3
+
+def test_seeds_give_different_tilings():
+    tilings = {frozenset(solve_grid_type("PUZZLE.lp", 1, 0, seed)[0]) for seed in range(5)}
+    assert len(tilings) > 1
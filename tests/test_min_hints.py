@@ -0,0 +1,23 @@
+from itertools import combinations
+
+from exact_cover import solve_grid_type
+from min_hints import minimum_hints, placements_from_atoms, smallest_hitting_set
+from uniqueness import is_unique
+
+def test_minimum_hints_agrees_with_is_unique():
+    solution = placements_from_atoms(solve_grid_type("PUZZLE.lp", 3, 0, 42)[0])
+    hints, stats = minimum_hints("PUZZLE.lp", 3, solution)
+    assert len(hints) == 2
+    assert set(hints) <= set(solution)
+    assert is_unique("PUZZLE.lp", 3, hints)
+    # No smaller hint set forces the solution
+    assert not any(is_unique("PUZZLE.lp", 3, list(smaller)) for smaller in combinations(solution, len(hints) - 1))
+    assert stats["checks"] == stats["counterexamples"] + 1
+
+def test_smallest_hitting_set():
+    masks = [0b011, 0b110, 0b100]
+    # No single piece meets all three masks
+    mask, size = smallest_hitting_set(masks, 0)
+    assert size == bin(mask).count("1") == 2
+    assert all(mask & m for m in masks)
+    assert smallest_hitting_set([], 0) == (0, 0)
@@ -0,0 +1,38 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from test_perf import holm, mann_whitney, smallest_p
+
+def permutation_p(a, b):
+    """Two-sided p-value of U by enumerating every split of the pooled values."""
+    pooled = a + b
+    m, n = len(a), len(b)
+
+    def u_of(first):
+        return sum(x > y for x in first for y in pooled if y not in first)
+
+    observed = abs(u_of(a) - m * n / 2)
+    splits = list(combinations(pooled, m))
+    return sum(abs(u_of(split) - m * n / 2) >= observed for split in splits) / len(splits)
+
+def test_mann_whitney_matches_permutation_test():
+    rng = random.Random(0)
+    for _ in range(200):
+        m, n = rng.randint(1, 6), rng.randint(1, 6)
+        values = rng.sample(range(1000), m + n)
+        a, b = values[:m], values[m:]
+        assert mann_whitney(a, b)[1] == pytest.approx(permutation_p(a, b))
+
+def test_mann_whitney_u():
+    assert mann_whitney([1, 2, 3], [4, 5, 6])[0] == 0
+    assert mann_whitney([4, 5, 6], [1, 2, 3])[0] == 9
+    assert mann_whitney([], [1])[1] == 1.0
+
+def test_smallest_p():
+    assert smallest_p(5, 5) == pytest.approx(2 / 252)
+    assert mann_whitney([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])[1] == pytest.approx(smallest_p(5, 5))
+
+def test_holm():
+    assert holm([0.01, 0.04, 0.03]) == pytest.approx([0.03, 0.06, 0.06])
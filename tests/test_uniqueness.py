@@ -0,0 +1,27 @@
+from exact_cover import solve_grid_type
+from min_hints import placements_from_atoms
+from uniqueness import count_completions, find_completions, is_unique
+
+def solution(encoding="PUZZLE.lp", grid_type=3, seed=42):
+    return placements_from_atoms(solve_grid_type(encoding, grid_type, 0, seed)[0])
+
+def test_full_solution_is_unique():
+    pieces = solution()
+    assert is_unique("PUZZLE.lp", 3, pieces)
+    assert find_completions("PUZZLE.lp", 3, pieces) == [frozenset(pieces)]
+
+def test_no_hints_is_not_unique():
+    assert not is_unique("PUZZLE.lp", 3, [])
+    assert count_completions("PUZZLE.lp", 3, [], limit=5) == 5
+
+def test_completions_extend_the_hints():
+    pieces = solution()
+    for tiling in find_completions("PUZZLE.lp", 3, pieces[:2], limit=0):
+        assert set(pieces[:2]) <= tiling
+        assert len(tiling) == len(pieces)
+
+def test_invalid_hints_have_no_completion():
+    # Both placements cover cell (0, 0, 0) of grid 1
+    assert count_completions("PUZZLE.lp", 3, [("I", 3, 0, 0, 0, 1), ("O", 1, 0, 0, 0, 1)]) == 0
+    # PUZZLE.lp has a single I
+    assert count_completions("PUZZLE.lp", 3, [("I", 3, 0, 0, 0, 1), ("I", 3, 0, 0, 0, 2)]) == 0
@@ -0,0 +1,147 @@
+import argparse
+import itertools
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from exact_cover import GRID_TYPES, build_matrix, get_pieces, label_pieces, solution_atoms
+from placement_index import get_placement_index
+from solve_cache import SolveCache, cache_key
+
+# Tileability of (box, multiset) pairs already checked in this process
+_TILEABLE = {}
+
+def half_partitions(pieces):
+    """List the ways to split the piece multiset in two halves, modulo swapping the grids.
+
+    Every partition is a pair of sorted type tuples (first half <= second half).
+    """
+    counts = Counter(type_name for _, type_name in pieces)
+    types = sorted(counts)
+    half_size = len(pieces) // 2
+    partitions = []
+    for taken in itertools.product(*(range(counts[t] + 1) for t in types)):
+        if sum(taken) != half_size:
+            continue
+        first = tuple(t for t, k in zip(types, taken) for _ in range(k))
+        second = tuple(t for t, k in zip(types, taken) for _ in range(counts[t] - k))
+        if first <= second:
+            partitions.append((first, second))
+    return partitions
+
+def colour_balance_possible(box, multiset):
+    """Checkerboard test: can the pieces' black-minus-white counts add up to the box's?
+
+    T and Pyramid always cover 3 cells of one colour, the other tetracubes 2 and 2,
+    so e.g. a balanced box needs an even number of T and Pyramid pieces. This rejects
+    most untileable halves before the (slow) exhaustive search.
+    """
+    index = get_placement_index(*box)
+
+    def balance(cells):
+        return sum(1 if sum(index.cell_coords(c)) % 2 == 0 else -1 for c in cells)
+
+    target = balance(range(index.num_cells))
+    reachable = {0}
+    for type_name in multiset:
+        options = {balance(index.placements[i].cells) for i in index.by_type[type_name]}
+        reachable = {total + option for total in reachable for option in options}
+    return target in reachable
+
+def tile_half(box, multiset, seed=None):
+    """Tile one grid with a multiset of types; return [(type, placement)] or None."""
+    if not colour_balance_possible(box, multiset):
+        return None
+    width, height, depth = box
+    # Copies of a type share their rows, so the order of equal pieces is never searched
+    pieces = [(type_name, type_name) for type_name in multiset]
+    matrix, rows = build_matrix(width, height, depth, 1, pieces, seed, True)
+    solutions = matrix.solve(1)
+    if not solutions:
+        return None
+    return [(rows[i][0], rows[i][1]) for i in solutions[0]]
+
+def check_halves(box, multisets, seed=None, workers=None):
+    """Tile every multiset (each once), in parallel worker processes when workers > 1.
+
+    Returns {multiset: tiling or None}; the tileability is also memoized per process,
+    so multisets already known to be impossible are not searched again.
+    """
+    todo = [m for m in multisets if _TILEABLE.get((box, m), True)]
+    results = {m: None for m in multisets}
+    if workers and workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tilings = list(pool.map(tile_half, itertools.repeat(box), todo, itertools.repeat(seed),
+                                    chunksize=max(1, len(todo) // (4 * workers))))
+    else:
+        tilings = [tile_half(box, m, seed) for m in todo]
+    for multiset, tiling in zip(todo, tilings):
+        _TILEABLE[(box, multiset)] = tiling is not None
+        results[multiset] = tiling
+    return results
+
+def solve_two_grids(encoding="PUZZLE.lp", num_hints=3, seed=42, workers=None, first_only=True, cache=None):
+    """Solve grid_type 3 in two stages: split the pieces, then tile each grid on its own.
+
+    Returns (atoms of the first solution or None, stats). With first_only the
+    partitions are checked in batches in a seeded order until one works, otherwise
+    every partition is checked and stats report how many are tileable. With a
+    SolveCache both are stored and reused.
+    """
+    if cache is not None:
+        # The batch size, and so the first solution found, depends on the workers
+        constants = {"grid_type": 3, "num_hints": num_hints, "workers": workers, "first_only": first_only}
+        atoms, stats = cache.cached(cache_key(encoding, constants, seed, 1, "two-grid"),
+                                    lambda: solve_two_grids(encoding, num_hints, seed, workers, first_only))
+        return atoms, stats
+    width, height, depth, grids = GRID_TYPES[encoding][3]
+    box = (width, height, depth)
+    pieces = get_pieces(encoding)
+    partitions = half_partitions(pieces)
+    random.Random(seed).shuffle(partitions)
+
+    batch_size = max(8, 4 * (workers or 1)) if first_only else len(partitions)
+    stats = {"partitions": len(partitions), "checked_partitions": 0, "searched_multisets": 0,
+             "tileable_partitions": 0}
+    found = None
+    for start in range(0, len(partitions), batch_size):
+        batch = partitions[start:start + batch_size]
+        multisets = sorted({half for partition in batch for half in partition})
+        stats["searched_multisets"] += sum(_TILEABLE.get((box, m), True) for m in multisets)
+        tilings = check_halves(box, multisets, seed, workers)
+        stats["checked_partitions"] += len(batch)
+        for first, second in batch:
+            if tilings[first] is not None and tilings[second] is not None:
+                stats["tileable_partitions"] += 1
+                if found is None:
+                    found = (tilings[first], tilings[second])
+        if found and first_only:
+            break
+
+    if found is None:
+        return None, stats
+    rows = [(type_name, placement, grid) for grid, tiling in enumerate(found, 1) for type_name, placement in tiling]
+    placements = label_pieces(rows, pieces, width * height * depth)
+    rng = random.Random(seed)
+    hints = set(rng.sample([piece for piece, _ in pieces], min(num_hints, len(pieces))))
+    return solution_atoms(placements, pieces, hints, True), stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two-stage solving of the two-grid mode (grid_type 3).")
+    parser.add_argument("encoding", choices=sorted(GRID_TYPES))
+    parser.add_argument("--num-hints", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--all", action="store_true", help="check every partition instead of stopping at the first")
+    parser.add_argument("--cache", default=None, help="directory of a solve cache shared between runs")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    cache = SolveCache(args.cache) if args.cache else None
+    atoms, stats = solve_two_grids(args.encoding, args.num_hints, args.seed, args.workers, not args.all, cache)
+    elapsed = time.perf_counter() - start_time
+    print(" ".join(atoms) if atoms else "UNSATISFIABLE")
+    print(f"{stats['checked_partitions']}/{stats['partitions']} partitions checked, "
+          f"{stats['searched_multisets']} multisets searched, "
+          f"{stats['tileable_partitions']} tileable, {elapsed:.3f}s")
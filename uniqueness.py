@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+
+from exact_cover import GRID_TYPES, build_matrix, get_pieces, row_columns
+
+@lru_cache(maxsize=None)
+def get_matrix(encoding, grid_type):
+    """Return (matrix, rows, row index of each (type, rotation, x, y, z, grid)), built once.
+
+    The pieces of one type share their rows, so completions that only swap
+    interchangeable pieces count as one.
+    """
+    width, height, depth, grids = GRID_TYPES[encoding][grid_type]
+    matrix, rows = build_matrix(width, height, depth, grids, get_pieces(encoding))
+    row_index = {tuple(placement[:5]) + (grid,): i for i, (_, placement, grid) in enumerate(rows)}
+    return matrix, rows, row_index
+
+def hints_from_record(record):
+    """Return the hint placements of a puzzle written by generate_batch.py."""
+    return [(p["type"], p["rotation"]) + tuple(p["anchor"]) + (p["grid"],)
+            for p in record["pieces"] if p["hint"]]
+
+def find_completions(encoding, grid_type, hints, limit=2):
+    """Return up to limit tilings that extend the hint placements (limit=0 for all).
+
+    Every tiling is a frozenset of (type, rotation, x, y, z, grid) placements, the
+    hints included. Returns [] when the hints overlap or use too many pieces of a type.
+    """
+    matrix, rows, row_index = get_matrix(encoding, grid_type)
+    width, height, depth, _ = GRID_TYPES[encoding][grid_type]
+    available = Counter(type_name for _, type_name in get_pieces(encoding))
+    if any(hint not in row_index for hint in hints) or Counter(h[0] for h in hints) - available:
+        return []
+    cells = [cell for hint in hints for cell in row_columns(rows[row_index[hint]], width * height * depth)]
+    if len(cells) != len(set(cells)):
+        return []
+
+    for hint in hints:
+        matrix.select(row_index[hint])
+    try:
+        solutions = matrix.solve(limit)
+    finally:
+        for hint in reversed(hints):
+            matrix.deselect(row_index[hint])
+    return [frozenset(hints) | {tuple(rows[i][1][:5]) + (rows[i][2],) for i in solution}
+            for solution in solutions]
+
+def count_completions(encoding, grid_type, hints, limit=2):
+    """Count the tilings that extend the hint placements, stopping at limit."""
+    return len(find_completions(encoding, grid_type, hints, limit))
+
+def is_unique(encoding, grid_type, hints):
+    """True when the hint placements force exactly one completion."""
+    return count_completions(encoding, grid_type, hints, 2) == 1
+
+def filter_file(input_file, output_file, annotate=False):
+    """Copy the unique puzzles of a generate_batch.py file (all of them, with a
+    "solutions" field of 0, 1 or 2, when annotate is set); return (read, kept)."""
+    read = kept = 0
+    with open(input_file) as lines, open(output_file, "w") as out:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            read += 1
+            solutions = count_completions(record["encoding"], record["grid_type"], hints_from_record(record))
+            if annotate:
+                record["solutions"] = solutions
+            if annotate or solutions == 1:
+                kept += solutions == 1
+                out.write(json.dumps(record) + "\n")
+    return read, kept
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the puzzles whose hints force a unique solution.")
+    parser.add_argument("input", help="JSONL file written by generate_batch.py")
+    parser.add_argument("--output", default="unique.jsonl")
+    parser.add_argument("--annotate", action="store_true",
+                        help="keep every puzzle and add its number of solutions (0, 1 or 2+)")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    read, kept = filter_file(args.input, args.output, args.annotate)
+    print(f"{kept}/{read} puzzles unique, {time.perf_counter() - start_time:.2f}s", file=sys.stderr)
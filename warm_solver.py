@@ -0,0 +1,178 @@
+import argparse
+import statistics
+import time
+
+import clingo
+
+from exact_cover import GRID_TYPES, get_pieces
+from solve_puzzle import solve_with_clingo
+from solve_stats import control_stats, enable_log, log_record
+
+# Hints are chosen in this part instead of the encoding's hint/1 rules (loaded with
+# num_hints=0), so the count is an external that changes between requests
+WARM_PROGRAM = """
+#external hintCount(N) : N = 0..{num_pieces}.
+{{ warmHint(P) : {piece_predicate}(P) }}.
+:- hintCount(N), not N = #count {{ P : warmHint(P) }}.
+#show warmHint/1.
+"""
+
+# Signs are forgotten between requests so that a new seed gives a new tiling,
+# learned nogoods and variable scores are kept
+SOLVER_ARGUMENTS = ["--rand-freq=0.05", "--forget-on-step=signs"]
+
+class WarmSolver:
+    """A grounded clingo.Control that answers many puzzle requests for one grid type.
+
+    The encoding is loaded and grounded once; each request only assigns externals
+    (hint count, excluded solutions) and passes assumptions (pinned hint pieces), so
+    the ground program and the learned nogoods are reused. Because the solver keeps
+    its state, the answer for a seed also depends on the requests made before it.
+    """
+
+    def __init__(self, encoding="PUZZLE.lp", grid_type=1, arguments=()):
+        self.encoding = encoding
+        self.grid_type = grid_type
+        self.pieces = [piece for piece, _ in get_pieces(encoding)]
+        piece_predicate = "tetracubeType" if encoding.startswith("PUZZLE.") else "tetracubeID"
+
+        start_time = time.perf_counter()
+        self.ctl = clingo.Control(["-c", f"grid_type={grid_type}", "-c", "num_hints=0"]
+                                  + SOLVER_ARGUMENTS + list(arguments))
+        self.ctl.load(encoding)
+        self.ctl.add("warm", [], WARM_PROGRAM.format(num_pieces=len(self.pieces),
+                                                     piece_predicate=piece_predicate))
+        self.ctl.ground([("base", []), ("warm", [])])
+        self.ground_time = time.perf_counter() - start_time
+
+        self.exclusions = {}
+        self.latencies = []
+        self.last_stats = None
+
+    def _hint_count(self, count):
+        return clingo.Function("hintCount", [clingo.Number(count)])
+
+    def _exclusion(self, atoms):
+        """Return the external that forbids the tiling of a previous answer (grounded once)."""
+        positions = frozenset("position" + atom[len("fullPosition"):]
+                              for atom in atoms if atom.startswith("fullPosition("))
+        if positions not in self.exclusions:
+            k = len(self.exclusions)
+            name = f"exclude{k}"
+            self.ctl.add(name, [], f"#external excluded({k}).\n"
+                                   f":- excluded({k}), {', '.join(sorted(positions))}.")
+            self.ctl.ground([(name, [])])
+            self.exclusions[positions] = clingo.Function("excluded", [clingo.Number(k)])
+        return self.exclusions[positions]
+
+    def generate(self, num_hints, seed=42, exclude=(), pinned=()):
+        """Solve one puzzle and return its atoms as clingo would show them (or None).
+
+        exclude is a list of previous answers whose tilings may not be returned again,
+        pinned a list of pieces that must be among the hints.
+        """
+        start_time = time.perf_counter()
+        active = {self._exclusion(atoms) for atoms in exclude}
+        for external in self.exclusions.values():
+            self.ctl.assign_external(external, external in active)
+        for count in range(len(self.pieces) + 1):
+            self.ctl.assign_external(self._hint_count(count), count == num_hints)
+        self.ctl.configuration.solver.seed = str(seed)
+        ground_time = time.perf_counter() - start_time
+
+        assumptions = [(clingo.Function("warmHint", [piece_symbol(piece)]), True) for piece in pinned]
+        answer = None
+        solve_start = time.perf_counter()
+        with self.ctl.solve(yield_=True, assumptions=assumptions) as handle:
+            for model in handle:
+                answer = puzzle_atoms(model.symbols(shown=True))
+                break
+        end_time = time.perf_counter()
+        self.latencies.append(end_time - start_time)
+        # ground_time of a request is the grounding of new exclusions and the externals
+        self.last_stats = control_stats(self.ctl, ground_time, end_time - solve_start)
+        log_record("warm", self.encoding, GRID_TYPES[self.encoding][self.grid_type], len(self.pieces),
+                   self.last_stats, grid_type=self.grid_type, num_hints=num_hints, seed=seed,
+                   result="SAT" if answer is not None else "UNSAT")
+        return answer
+
+    def stats(self):
+        """Latency statistics of the requests answered so far (seconds)."""
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {"requests": 0, "ground_time": self.ground_time}
+        return {"requests": len(latencies), "ground_time": self.ground_time,
+                "mean": statistics.mean(latencies), "median": statistics.median(latencies),
+                "p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+                "max": latencies[-1]}
+
+def piece_symbol(piece):
+    """Piece names are strings in PUZZLE.lp and numbers in PUZZLE_COMPLEX.lp."""
+    return clingo.Number(piece) if isinstance(piece, int) else clingo.String(piece)
+
+def puzzle_atoms(symbols):
+    """Turn warmHint/1 into the hint/1 and hintPosition atoms of the encodings."""
+    hints = {symbol.arguments[0] for symbol in symbols if symbol.name == "warmHint"}
+    atoms = []
+    for symbol in symbols:
+        if symbol.name == "warmHint":
+            atoms.append(str(clingo.Function("hint", symbol.arguments)))
+            continue
+        atoms.append(str(symbol))
+        if symbol.name == "fullPosition" and symbol.arguments[0] in hints:
+            atoms.append(str(clingo.Function("hintPosition", symbol.arguments)))
+    return atoms
+
+def benchmark(encoding="PUZZLE.lp", grid_type=1, num_hints=6, requests=20):
+    """Compare the warm solver with one clingo process per puzzle on the same seeds."""
+    print(f"{encoding} grid_type={grid_type} num_hints={num_hints}, {requests} requests")
+    start_time = time.perf_counter()
+    solver = WarmSolver(encoding, grid_type)
+    answers = []
+    for seed in range(requests):
+        answers.append(solver.generate(num_hints, seed, exclude=answers))
+    warm_total = time.perf_counter() - start_time
+    stats = solver.stats()
+
+    cold = []
+    for seed in range(requests):
+        start_time = time.perf_counter()
+        solve_with_clingo(encoding, grid_type, num_hints, seed)
+        cold.append(time.perf_counter() - start_time)
+
+    distinct = len({frozenset(a for a in atoms if a.startswith("fullPosition")) for atoms in answers if atoms})
+    print(f"  warm: ground {stats['ground_time'] * 1000:.1f} ms, per request median "
+          f"{stats['median'] * 1000:.1f} ms, p95 {stats['p95'] * 1000:.1f} ms, max {stats['max'] * 1000:.1f} ms, "
+          f"total {warm_total:.2f}s, {distinct} distinct tilings")
+    print(f"  cold: per request median {statistics.median(cold) * 1000:.1f} ms, "
+          f"max {max(cold) * 1000:.1f} ms, total {sum(cold):.2f}s")
+    print(f"  speedup: {sum(cold) / warm_total:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer many puzzle requests with one grounded solver.")
+    parser.add_argument("encoding", choices=sorted(GRID_TYPES))
+    parser.add_argument("--grid-type", type=int, default=1)
+    parser.add_argument("--num-hints", type=int, default=None)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--benchmark", action="store_true", help="compare with one clingo process per puzzle")
+    parser.add_argument("--stats-log", default=None, help="append a JSON record of every solve to this file")
+    args = parser.parse_args()
+    if args.stats_log:
+        enable_log(args.stats_log)
+    num_hints = args.num_hints if args.num_hints is not None else (6 if args.encoding == "PUZZLE.lp" else 8)
+
+    if args.benchmark:
+        benchmark(args.encoding, args.grid_type, num_hints, args.requests)
+    else:
+        solver = WarmSolver(args.encoding, args.grid_type)
+        answers = []
+        for seed in range(args.requests):
+            atoms = solver.generate(num_hints, seed, exclude=answers)
+            if atoms is None:
+                print("UNSATISFIABLE")
+                break
+            answers.append(atoms)
+            print(" ".join(atoms))
+        stats = solver.stats()
+        print(f"{stats['requests']} requests, ground {stats['ground_time'] * 1000:.1f} ms, "
+              f"median {stats.get('median', 0) * 1000:.1f} ms")